@@ -8,32 +8,93 @@ Designed for containerised deployment with:
 
 Key differences from the bare-metal install version:
   • Network stats read from /proc/1/net/dev  (host NIC, not container veth)
-  • Real-time RX/TX bandwidth via class-level snapshot cache
+  • Real-time RX/TX bandwidth computed by a single background sampler
   • Service detection from /proc/1/net/{tcp,tcp6,udp} — no systemd needed
   • Top-processes table always populated (no cpu_percent > 0 gate)
   • WireGuard detected via wg* interfaces in /proc/1/net/dev
 """
 
+import asyncio
+import bisect
+import errno
+import functools
+import gzip
+import hashlib
+import heapq
 import html
 import json
+import math
+import mmap
 import os
+import pwd
+import re
+import resource
 import signal
 import socket
+import struct
 import subprocess
 import sys
+import threading
 import time
+import traceback
+import zlib
+from array import array
+from concurrent import futures
 from datetime import datetime
+from email.utils import formatdate
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from socketserver import ThreadingMixIn
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlsplit
 
 import psutil
 
+try:  # optional: Content-Encoding: br when the brotli module is installed
+    import brotli
+except ImportError:
+    brotli = None
+
+
 # ─── Threading HTTP Server ────────────────────────────────────────────────────
 
 
+# Seconds a persistent connection may sit between requests (and the read /
+# write timeout within one)
+HTTP_IDLE_TIMEOUT = 10
+
+# Connections (threads) served at once, streams included; more get a 503
+HTTP_MAX_CONNECTIONS = 256
+
+_HTTP_BUSY = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Length: 0\r\nRetry-After: 5\r\nConnection: close\r\n\r\n"
+)
+
+
 class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
     daemon_threads = True
     allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._slots = threading.BoundedSemaphore(HTTP_MAX_CONNECTIONS)
+
+    def process_request(self, request, client_address) -> None:
+        if not self._slots.acquire(blocking=False):
+            try:
+                request.sendall(_HTTP_BUSY)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        super().process_request(request, client_address)
+
+    def process_request_thread(self, request, client_address) -> None:
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
 
 
 # ─── Port → friendly service name ────────────────────────────────────────────
@@ -87,40 +148,1921 @@ PORT_TO_SERVICE: dict[int, str] = {
 }
 
 
-# ─── Request Handler ──────────────────────────────────────────────────────────
+# ─── Per-collector TTL cache ──────────────────────────────────────────────────
+
+
+class _CacheEntry:
+    __slots__ = ("value", "expires", "refreshing")
+
+    def __init__(self, value, expires: float | None) -> None:
+        self.value = value
+        self.expires = expires  # monotonic deadline; None = never expires
+        self.refreshing = False
+
+
+def cached(ttl: float | None, stale_while_revalidate: bool = False):
+    """
+    Declare a refresh cadence for a MetricsCollector method.
+
+    The result is kept on the collector instance for `ttl` seconds
+    (ttl=None caches for the life of the process).  With
+    stale_while_revalidate an expired value is returned immediately while a
+    daemon thread refreshes it, so a slow fork never blocks a sample; only
+    the very first call waits for a real value.
+    """
+
+    def decorator(fn):
+        key = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(self):
+            entry = self._cache.get(key)
+            if entry is not None and (
+                entry.expires is None or time.monotonic() < entry.expires
+            ):
+                return entry.value
+            if entry is not None and stale_while_revalidate:
+                with self._cache_lock:
+                    if entry.refreshing:
+                        return entry.value
+                    entry.refreshing = True
+                threading.Thread(
+                    target=self._refresh_cached,
+                    args=(key, fn, ttl),
+                    name=f"refresh-{key}",
+                    daemon=True,
+                ).start()
+                return entry.value
+            return self._refresh_cached(key, fn, ttl)
+
+        wrapper.cache_ttl = ttl
+        return wrapper
+
+    return decorator
+
+
+# ─── Metric history ───────────────────────────────────────────────────────────
+
+# Series kept in history: name → extractor over a get_system_metrics() payload
+HISTORY_METRICS: dict = {
+    "cpu": lambda m: m["cpu"]["overall"],
+    "memory": lambda m: m["memory"]["percent"],
+    "swap": lambda m: m["memory"]["swap_percent"],
+    "disk": lambda m: max(d["percent"] for d in m["disk"]),
+    "net_rx": lambda m: m["network"]["rx_bytes_per_sec"],
+    "net_tx": lambda m: m["network"]["tx_bytes_per_sec"],
+    "conn_established": lambda m: m["connections"]["established"],
+    "conn_total": lambda m: m["connections"]["total"],
+}
 
+# Aggregates kept per rollup bucket
+HISTORY_STATS: tuple = ("min", "max", "avg", "last")
+
+
+# On-disk tier layout: a 64-byte header of eight int64 slots, then one
+# float64 column of `capacity` slots for timestamps and for every series.
+_HISTORY_MAGIC = b"OMHIST01"
+_HISTORY_VERSION = 1
+_HEADER_SIZE = 64
+_H_VERSION, _H_CAPACITY, _H_COLUMNS, _H_LAYOUT, _H_RES_MS, _H_HEAD, _H_COUNT = range(
+    1, 8
+)
+
+
+class _Ring:
+    """
+    Fixed-capacity ring of timestamped slots stored column-wise in a single
+    buffer: a bytearray, or a shared mmap when a file path is given.
+
+    Columns are memoryview casts into that buffer, so a write is a store
+    into the page cache (no per-sample fsync) and a range read is a
+    zero-copy slice.  Head and count live in the header, which lets a
+    restarted process reattach to an existing file without parsing it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        resolution: float,
+        capacity: int,
+        columns: list,
+        path: str | None = None,
+    ) -> None:
+        self.name = name
+        self.resolution = resolution
+        self.capacity = max(1, capacity)
+        self.nbytes = _HEADER_SIZE + 8 * self.capacity * (1 + len(columns))
+        layout = (
+            _HISTORY_VERSION,
+            self.capacity,
+            len(columns),
+            zlib.crc32(",".join(columns).encode()),
+            round(resolution * 1000),
+        )
+        self._buf = self._open(path) if path else bytearray(self.nbytes)
+        view = memoryview(self._buf)
+        self._meta = view[:_HEADER_SIZE].cast("q")
+        self.reattached = (
+            bytes(view[:8]) == _HISTORY_MAGIC and tuple(self._meta[1:6]) == layout
+        )
+        if not self.reattached:
+            view[:8] = _HISTORY_MAGIC
+            self._meta[1:6] = array("q", layout)
+            self._meta[_H_HEAD] = -1
+            self._meta[_H_COUNT] = 0
+
+        span = 8 * self.capacity
+        cols = [
+            view[off : off + span].cast("d")
+            for off in range(_HEADER_SIZE, self.nbytes, span)
+        ]
+        self._ts = cols[0]
+        self._cols = dict(zip(columns, cols[1:]))
 
-class MonitorHandler(BaseHTTPRequestHandler):
-    timeout = 10
+    def _open(self, path: str) -> mmap.mmap:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != self.nbytes:
+                os.ftruncate(fd, 0)  # size changed: start over
+                os.ftruncate(fd, self.nbytes)
+            # Allocate every block now: a write to a hole in a full filesystem
+            # is a SIGBUS through the mapping, ENOSPC here is an OSError
+            try:
+                os.posix_fallocate(fd, 0, self.nbytes)
+            except OSError as exc:
+                if exc.errno not in (errno.EOPNOTSUPP, errno.EINVAL):
+                    raise
+            return mmap.mmap(fd, self.nbytes)
+        finally:
+            os.close(fd)
+
+    def flush(self) -> None:
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.flush()
+
+    @property
+    def _head(self) -> int:
+        return self._meta[_H_HEAD]
+
+    @property
+    def _count(self) -> int:
+        return self._meta[_H_COUNT]
+
+    def _advance(self) -> int:
+        head = (self._head + 1) % self.capacity
+        self._meta[_H_COUNT] = min(self._count + 1, self.capacity)
+        self._meta[_H_HEAD] = head
+        return head
+
+    def covers(self, since: float) -> bool:
+        """True if nothing at or after `since` has been evicted yet."""
+        return self._count < self.capacity or self.oldest() <= since
+
+    def oldest(self) -> float:
+        return self._ts[(self._head - self._count + 1) % self.capacity]
+
+    def _ranges(self, since: float) -> list:
+        """Slot ranges [(lo, hi), ...] holding samples at or after `since`."""
+        n, cap, ts = self._count, self.capacity, self._ts
+        start = (self._head - n + 1) % cap
+        first = bisect.bisect_left(range(n), since, key=lambda k: ts[(start + k) % cap])
+        lo, hi = (start + first) % cap, (start + n - 1) % cap + 1
+        if first == n:
+            return []
+        return [(lo, hi)] if lo < hi else [(lo, cap), (0, hi)]
+
+    def read(self, column: str, since: float) -> list:
+        """Zero-copy memoryview slices of one column from `since` onward."""
+        col = self._ts if column == "ts" else self._cols[column]
+        return [col[lo:hi] for lo, hi in self._ranges(since)]
+
+
+class _RawTier(_Ring):
+    """One value per sample and series."""
+
+    def __init__(self, resolution: float, capacity: int, path=None) -> None:
+        super().__init__("raw", resolution, capacity, list(HISTORY_METRICS), path)
+
+    def add(self, ts: float, row: dict) -> None:
+        i = self._advance()
+        self._ts[i] = ts
+        for name, value in row.items():
+            self._cols[name][i] = value
+
+    def query(self, metrics: list, since: float, stat: str) -> dict:
+        out: dict = {"ts": [round(t, 3) for v in self.read("ts", since) for t in v]}
+        for name in metrics:
+            out[name] = [
+                None if math.isnan(x) else x for v in self.read(name, since) for x in v
+            ]
+        return out
 
-    # Class-level snapshot for real-time bandwidth (shared across requests)
-    _prev_net_bytes: dict = {"recv": 0, "sent": 0}
-    _prev_net_ts: float | None = None
 
-    # ── Logging ───────────────────────────────────────────────────────────────
+class _RollupTier(_Ring):
+    """
+    Fixed-width buckets holding min/max/avg/last per series.  The newest
+    bucket is updated in place as samples arrive, so a rollup is never
+    recomputed from raw data and the open bucket is queryable too.
+    """
 
-    def log_message(self, format, *args):
-        pass  # suppress per-request noise
+    def __init__(self, name: str, resolution: int, capacity: int, path=None) -> None:
+        columns = [
+            f"{metric}.{field}"
+            for metric in HISTORY_METRICS
+            for field in ("n",) + HISTORY_STATS
+        ]
+        super().__init__(name, resolution, capacity, columns, path)
+        self._n = {m: self._cols[f"{m}.n"] for m in HISTORY_METRICS}
+        self._stats = {
+            m: {stat: self._cols[f"{m}.{stat}"] for stat in HISTORY_STATS}
+            for m in HISTORY_METRICS
+        }
 
-    # ── Routing ───────────────────────────────────────────────────────────────
+    def add(self, ts: float, row: dict) -> None:
+        start = ts - ts % self.resolution
+        if self._count == 0 or start > self._ts[self._head]:
+            i = self._advance()
+            self._ts[i] = start
+            for name in self._n:
+                self._n[name][i] = 0
+                for col in self._stats[name].values():
+                    col[i] = math.nan
+        i = self._head
+        for name, v in row.items():
+            if math.isnan(v):
+                continue
+            k = self._n[name][i] + 1
+            self._n[name][i] = k
+            st = self._stats[name]
+            if k == 1:
+                st["min"][i] = st["max"][i] = st["avg"][i] = v
+            else:
+                st["min"][i] = min(st["min"][i], v)
+                st["max"][i] = max(st["max"][i], v)
+                st["avg"][i] += (v - st["avg"][i]) / k
+            st["last"][i] = v
+
+    def query(self, metrics: list, since: float, stat: str) -> dict:
+        # a bucket is included if any part of it falls at or after `since`
+        since = since - self.resolution + 1e-6
+        out: dict = {"ts": [t for v in self.read("ts", since) for t in v]}
+        for name in metrics:
+            out[name] = [
+                None if math.isnan(x) else round(x, 3)
+                for v in self.read(f"{name}.{stat}", since)
+                for x in v
+            ]
+        return out
 
-    def do_GET(self):
-        if self.path == "/":
-            self.send_response(200)
-            self.send_header("Content-type", "text/html")
-            self.end_headers()
-            self.wfile.write(self.get_dashboard_html().encode())
-
-        elif self.path == "/api/metrics":
-            self.send_response(200)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Cache-Control", "no-cache")
-            self.end_headers()
-            self.wfile.write(json.dumps(self.get_system_metrics()).encode())
 
+# Rollup tiers: (name, bucket seconds, buckets kept)
+HISTORY_ROLLUPS: tuple = (
+    ("1m", 60, 2 * 24 * 60),  # 2 days
+    ("1h", 3600, 90 * 24),  # 90 days
+)
+
+
+class MetricHistory:
+    """
+    Fixed-memory, multi-resolution history of recent samples.
+
+    Every sample lands in three tiers at once: a raw ring at sampling
+    resolution (HISTORY_HOURS deep) and cascading 1-minute and 1-hour
+    rollups holding min/max/avg/last per bucket (see HISTORY_ROLLUPS).
+    Each tier is a set of float64 columns allocated up front, so the
+    footprint on a 1 GB instance is known at startup and never grows.
+    Missing values are stored as NaN and returned as null.
+
+    With a `directory` every tier is a memory-mapped history-<tier>.bin
+    file there, so history survives container restarts.  A file whose
+    layout no longer matches (interval or retention changed) is reset.
+
+    query() picks the finest tier that still covers the requested range
+    within the caller's point budget, so a 7-day chart costs about as much
+    to ship as a 5-minute one.
+    """
+
+    def __init__(
+        self, resolution: float, capacity: int, directory: str | None = None
+    ) -> None:
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        def path(tier: str) -> str | None:
+            return os.path.join(directory, f"history-{tier}.bin") if directory else None
+
+        self.tiers: list = [_RawTier(resolution, capacity, path("raw"))] + [
+            _RollupTier(name, res, cap, path(name))
+            for name, res, cap in HISTORY_ROLLUPS
+        ]
+        self._lock = threading.Lock()
+
+    def flush(self) -> None:
+        with self._lock:
+            for tier in self.tiers:
+                tier.flush()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(t.nbytes for t in self.tiers)
+
+    def record(self, ts: float, data: dict) -> None:
+        row: dict = {}
+        for name, extract in HISTORY_METRICS.items():
+            try:
+                row[name] = float(extract(data))
+            except (KeyError, TypeError, ValueError):
+                row[name] = math.nan
+        with self._lock:
+            for tier in self.tiers:
+                tier.add(ts, row)
+
+    def query(
+        self, metrics: list, since: float = 0.0, points: int = 600, stat: str = "avg"
+    ) -> dict:
+        """
+        Return {"tier", "resolution", "stat", "ts": [...], <metric>: [...]}
+        for samples at or after `since`, from the finest tier that covers
+        the range in at most `points` points (the coarsest tier otherwise).
+        On the raw tier every stat is simply the sampled value.
+        """
+        with self._lock:
+            coarsest = self.tiers[-1]
+            first = coarsest.oldest() if coarsest._count else time.time()
+            span = max(0.0, time.time() - max(since, first))
+            tier = next(
+                (
+                    t
+                    for t in self.tiers
+                    if t.covers(since) and span / t.resolution <= points
+                ),
+                coarsest,
+            )
+            out = {"tier": tier.name, "resolution": tier.resolution, "stat": stat}
+            out.update(tier.query(metrics, since, stat))
+        return out
+
+
+# ─── Socket state counting ────────────────────────────────────────────────────
+
+# Kernel TCP state codes (include/net/tcp_states.h)
+TCP_STATES: dict[int, str] = {
+    0x01: "ESTABLISHED",
+    0x02: "SYN_SENT",
+    0x03: "SYN_RECV",
+    0x04: "FIN_WAIT1",
+    0x05: "FIN_WAIT2",
+    0x06: "TIME_WAIT",
+    0x07: "CLOSE",
+    0x08: "CLOSE_WAIT",
+    0x09: "LAST_ACK",
+    0x0A: "LISTEN",
+    0x0B: "CLOSING",
+}
+
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+_NLMSG_HDR = struct.Struct("=LHHLL")  # len, type, flags, seq, pid
+
+# nlmsghdr + inet_diag_req_v2 (family, protocol, ext, pad, states, 48-byte id)
+_DIAG_REQ = struct.Struct("=LHHLLBBBBL48x")
+
+
+def _sock_diag_states(family: int, protocol: int) -> dict:
+    """
+    Dump every socket of one family/protocol over NETLINK_SOCK_DIAG and
+    return {state code: count}.  Only the state byte of each inet_diag_msg
+    is read; no per-socket objects are built.
+    """
+    req = _DIAG_REQ.pack(
+        _DIAG_REQ.size,
+        SOCK_DIAG_BY_FAMILY,
+        NLM_F_REQUEST | NLM_F_DUMP,
+        1,
+        0,
+        family,
+        protocol,
+        0,
+        0,
+        0xFFFFFFFF,  # every state
+    )
+    counts: dict = {}
+    buf = bytearray(1 << 17)
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_SOCK_DIAG) as s:
+        s.settimeout(2)
+        s.sendto(req, (0, 0))
+        while True:
+            n = s.recv_into(buf)
+            off = 0
+            while off + _NLMSG_HDR.size <= n:
+                length, msg_type = _NLMSG_HDR.unpack_from(buf, off)[:2]
+                if msg_type == NLMSG_DONE:
+                    return counts
+                if msg_type == NLMSG_ERROR:
+                    errno = -struct.unpack_from("=i", buf, off + 16)[0]
+                    raise OSError(errno, os.strerror(errno))
+                if length < _NLMSG_HDR.size:
+                    raise OSError("malformed sock_diag reply")
+                state = buf[off + 17]  # inet_diag_msg.idiag_state
+                counts[state] = counts.get(state, 0) + 1
+                off += (length + 3) & ~3
+
+
+# Rows of /proc/net/{tcp,udp}[6]: "  sl  local_address rem_address   st ..."
+# The kernel prints addresses and state as fixed-width upper-case hex, so
+# the patterns can start at the ": " after the slot number and let re find
+# rows in C.  _SOCKET_STATE captures st; _SOCKET_BOUND captures the local
+# port of rows whose st is the one given.
+_SOCKET_STATE = re.compile(
+    rb": [0-9A-F]{8,32}:[0-9A-F]{4} [0-9A-F]{8,32}:[0-9A-F]{4} ([0-9A-F]{2}) "
+)
+_SOCKET_BOUND = {
+    st: re.compile(
+        rb": [0-9A-F]{8,32}:([0-9A-F]{4}) [0-9A-F]{8,32}:[0-9A-F]{4} " + st + rb" "
+    )
+    for st in (b"0A", b"07")
+}
+
+# Tables scanned, with the state that means "listening" for each
+SOCKET_TABLES: tuple = (
+    ("tcp", "TCP", b"0A"),
+    ("tcp6", "TCP", b"0A"),
+    ("udp", "UDP", b"07"),  # UDP has no connection state: 07 = bound
+    ("udp6", "UDP", b"07"),
+)
+
+
+def iter_socket_table(path: str, chunk: int = 1 << 20):
+    """
+    Yield one socket table as chunks of whole rows, read unbuffered
+    `chunk` bytes at a time so memory stays bounded however many sockets
+    there are.  Raises OSError when the table cannot be opened.
+    """
+    tail = b""
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            data = f.read(chunk)
+            if not data:
+                break
+            data = tail + data
+            cut = data.rfind(b"\n") + 1
+            tail = data[cut:]
+            yield data[:cut]
+
+
+class SocketScan(NamedTuple):
+    tcp_states: dict  # kernel TCP state code → count
+    udp: int  # bound UDP sockets
+    listening: dict  # port → "TCP" | "UDP" (TCP wins when both)
+
+
+def scan_socket_tables(bases: tuple = ("/proc/1/net", "/proc/net")) -> SocketScan:
+    """
+    One read of each of tcp, tcp6, udp and udp6 (host namespace first,
+    container namespace as fallback) producing the TCP state histogram,
+    the UDP count and the listening ports together.
+    """
+    tcp_hist: dict = {}
+    udp = 0
+    listening: dict = {}
+    for name, proto, want in SOCKET_TABLES:
+        bound = _SOCKET_BOUND[want]
+        for base in bases:
+            hist: dict = {}
+            ports: set = set()
+            try:
+                for rows in iter_socket_table(f"{base}/{name}"):
+                    for st in _SOCKET_STATE.findall(rows):
+                        hist[st] = hist.get(st, 0) + 1
+                    ports.update(bound.findall(rows))
+            except OSError:
+                continue
+            if proto == "UDP":
+                udp += sum(hist.values())
+            else:
+                for st, n in hist.items():
+                    code = int(st, 16)
+                    tcp_hist[code] = tcp_hist.get(code, 0) + n
+            for port in ports:
+                listening.setdefault(int(port, 16), proto)
+            break  # stop after first working base path
+    listening.pop(0, None)
+    return SocketScan(tcp_hist, udp, listening)
+
+
+def bench_socket_scan(rows: int = 100_000) -> None:
+    """
+    Time scan_socket_tables() against readlines()/split() parsing of the
+    same synthetic tcp table, and compare peak allocations
+    (`--bench-sockets [rows]`).
+    """
+    import tempfile
+    import tracemalloc
+
+    header = (
+        "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when "
+        "retrnsmt   uid  timeout inode\n"
+    )
+    row = (
+        "{sl:4d}: 0100007F:{lport:04X} 0100007F:{rport:04X} {st:02X} "
+        "00000000:00000000 00:00000000 00000000     0        0 {inode} 1 "
+        "0000000000000000 20 4 30 10 -1\n"
+    )
+
+    def split_parse(path: str, want: str) -> tuple:
+        hist: dict = {}
+        ports: list = []
+        with open(path) as f:
+            for line in f.readlines()[1:]:
+                cols = line.split()
+                if len(cols) < 4:
+                    continue
+                hist[cols[3]] = hist.get(cols[3], 0) + 1
+                if cols[3].lower() == want:
+                    ports.append(int(cols[1].split(":")[1], 16))
+        return hist, ports
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "tcp"), "w") as f:
+            f.write(header)
+            for i in range(rows):
+                st = 0x0A if i % 500 == 0 else (0x01, 0x06, 0x08)[i % 3]
+                f.write(
+                    row.format(sl=i, lport=i % 65535, rport=i % 60000, st=st, inode=i)
+                )
+        size = os.path.getsize(os.path.join(tmp, "tcp"))
+        print(f"Synthetic tcp table: {rows:,} rows, {size / 1048576:.1f} MB")
+        for label, fn in (
+            ("readlines + split", lambda: split_parse(os.path.join(tmp, "tcp"), "0a")),
+            ("streaming scan", lambda: scan_socket_tables((tmp,))),
+        ):
+            best = min(_timed(fn) for _ in range(5))
+            tracemalloc.start()
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(
+                f"  {label:<18} {best * 1000:8.1f} ms (best of 5)"
+                f"  peak {peak / 1048576:6.1f} MB"
+            )
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+# ─── Counter rates ────────────────────────────────────────────────────────────
+
+
+def counter_delta(cur: int, prev: int) -> int:
+    """
+    Increase of a monotonic kernel counter between two reads.  A drop from
+    the upper half of the 32-bit range is a wrap of a driver's 32-bit
+    counter; any other drop means the counter restarted (interface
+    re-created, driver reloaded), so everything counted since is `cur`.
+    """
+    if cur >= prev:
+        return cur - prev
+    if prev <= 0xFFFFFFFF and prev - cur > 0x7FFFFFFF:
+        return cur + 0x100000000 - prev
+    return cur
+
+
+def clamped_delta(cur: int, prev: int) -> int:
+    """
+    Increase of a counter that may dip slightly between reads (iowait
+    jiffies in /proc/stat, a sum over devices when one is detached): any
+    drop counts as no progress.
+    """
+    return max(0, cur - prev)
+
+
+# CounterRates on_drop modes → how a value below its baseline is read
+COUNTER_DROP: dict = {"zero": clamped_delta, "wrap": counter_delta}
+
+
+class CounterRates:
+    """
+    Turns monotonic counters into deltas and per-second rates.
+
+    Each series (an interface, a device, a PID, "cpu0", ...) keeps the
+    timestamp and values of its last update, so every rate is measured over
+    that series' own interval whoever calls and however often.  All access
+    goes through one lock, so concurrent callers can neither interleave a
+    read-modify-write nor see half an update.
+
+      min_interval  updates closer than this to the baseline return zero
+                    deltas and keep the baseline (sub-interval jitter)
+      limit         most series held; new ones beyond it are not tracked
+      on_drop       "zero" clamps a decrease to no progress (clamped_delta);
+                    "wrap" reads it as a 32-bit wrap or a reset
+                    (counter_delta), for per-interface network counters
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 0.0,
+        limit: int | None = None,
+        on_drop: str = "zero",
+    ) -> None:
+        self.min_interval = min_interval
+        self.limit = limit
+        self._delta = COUNTER_DROP[on_drop]
+        self._series: dict = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def update(self, key, values: tuple, now: float, since: tuple | None = None):
+        """
+        Record `values` for `key` at `now` and return (elapsed, deltas)
+        against the previous record.  A series seen for the first time is
+        measured against `since`, a (timestamp, values) baseline such as
+        boot or process start, and otherwise reports elapsed 0 and zeros.
+        """
+        with self._lock:
+            prev = self._series.get(key)
+            if prev is None:
+                if self.limit is None or len(self._series) < self.limit:
+                    self._series[key] = (now, values)
+                prev = since
+            elif now - prev[0] < self.min_interval:
+                prev = None
+            else:
+                self._series[key] = (now, values)
+        if prev is None or now <= prev[0]:
+            return 0.0, (0,) * len(values)
+        return now - prev[0], tuple(map(self._delta, values, prev[1]))
+
+    def rates(self, key, values: tuple, now: float, since: tuple | None = None):
+        """Per-second rates of update()'s deltas (zeros without a baseline)."""
+        elapsed, deltas = self.update(key, values, now, since)
+        if not elapsed:
+            return (0.0,) * len(values)
+        return tuple(d / elapsed for d in deltas)
+
+    def retain(self, keys) -> None:
+        """Forget every series not in `keys` (interfaces, PIDs that are gone)."""
+        keys = set(keys)
+        with self._lock:
+            for key in [k for k in self._series if k not in keys]:
+                del self._series[key]
+
+
+# ─── Process index ────────────────────────────────────────────────────────────
+
+# /proc/<pid>/stat state letter → the status names psutil reports
+PROC_STATUS: dict = {
+    b"R": "running",
+    b"S": "sleeping",
+    b"D": "disk-sleep",
+    b"Z": "zombie",
+    b"T": "stopped",
+    b"t": "tracing-stop",
+    b"X": "dead",
+    b"x": "dead",
+    b"I": "idle",
+    b"P": "parked",
+    b"W": "waking",
+    b"K": "wake-kill",
+}
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# Seconds between the startup baseline and the first published sample
+PROCESS_WARMUP = 0.5
+
+
+class _ProcEntry:
+    """One live process: identity read once, counters refreshed per cycle."""
+
+    __slots__ = (
+        "pid",
+        "comm",
+        "name",
+        "cmd",
+        "username",
+        "cpu_percent",
+        "read_rate",
+        "write_rate",
+        "rss",
+        "threads",
+        "status",
+        "fds",
+    )
+
+    def __init__(self, pid: int, comm: bytes) -> None:
+        self.pid = pid
+        self.comm = comm
+        self.cpu_percent = 0.0
+        self.read_rate = self.write_rate = None
+        self.fds = None
+
+
+class ProcessIndex:
+    """
+    Processes that persist between samples, keyed by (pid, start time).
+
+    psutil.process_iter() with cmdline and username re-reads several files
+    per PID per call.  refresh() instead lists /proc and reads only
+    /proc/<pid>/stat (ticks, threads, RSS, state) and /proc/<pid>/io
+    (bytes read from and written to storage) with one read each.  cmdline and
+    owner are read when a (pid, start) pair first appears, or when its comm
+    changes after an exec, so a recycled PID is never mistaken for the
+    process it replaced.
+
+    CPU% and I/O rates come from CounterRates series keyed the same way,
+    timed on CLOCK_BOOTTIME (the clock /proc start times are counted on).
+    A process born since the last refresh is measured from its start time,
+    so it is right on first sight; anything older needs one earlier
+    refresh as its baseline, which MetricsCollector takes at startup.
+
+    Costlier per-PID values (open fds) are read only when a ranking asks
+    for them, once per refresh however many requests do.
+    """
+
+    def __init__(self, proc: str = "/proc") -> None:
+        self.proc = proc
+        self.entries: dict[tuple, _ProcEntry] = {}
+        self.mem_total = psutil.virtual_memory().total
+        self._users: dict[int, str] = {}
+        self._ticks = CounterRates()
+        self._io = CounterRates()
+        self._filled: set = set()  # on-demand attributes read since refresh
+        self._lock = threading.Lock()
+
+    def refresh(self) -> list:
+        """Re-read every /proc/<pid>/stat; returns the live entries."""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> list:
+        old = self.entries
+        fresh: dict[tuple, _ProcEntry] = {}
+        for name in os.listdir(self.proc):
+            if not name.isdigit():
+                continue
+            try:
+                fd = os.open(f"{self.proc}/{name}/stat", os.O_RDONLY)
+                try:
+                    data = os.read(fd, 4096)
+                finally:
+                    os.close(fd)
+                now = time.clock_gettime(time.CLOCK_BOOTTIME)
+                close = data.rindex(b")")
+                comm = data[data.index(b"(") + 1 : close]
+                # fields 3.. of proc(5), so field n is at index n - 3
+                f = data[close + 2 :].split()
+                key = (int(name), int(f[19]))
+                ticks = int(f[11]) + int(f[12])
+            except (OSError, ValueError, IndexError):
+                continue  # exited between listdir() and read()
+
+            entry = old.get(key)
+            if entry is None or entry.comm != comm:  # new, or exec()ed
+                entry = self._identify(key[0], comm)
+                if entry is None:
+                    continue
+            started = key[1] / CLK_TCK  # zero ticks and no I/O back then
+            (cpu,) = self._ticks.rates(key, (ticks,), now, since=(started, (0,)))
+            entry.cpu_percent = round(cpu * 100 / CLK_TCK, 1)
+            try:
+                io = _proc_io_counters(self.proc, name)
+            except (OSError, ValueError):
+                pass  # another user's process and we are not root
+            else:
+                read, write = self._io.rates(key, io, now, since=(started, (0, 0)))
+                entry.read_rate, entry.write_rate = round(read, 1), round(write, 1)
+            entry.threads = int(f[17])
+            entry.rss = int(f[21]) * PAGE_SIZE
+            entry.status = PROC_STATUS.get(f[0], "?")
+            fresh[key] = entry
+        self.entries = fresh
+        self._filled.clear()
+        self._ticks.retain(fresh)
+        self._io.retain(fresh)
+        return list(fresh.values())
+
+    def top(self, sort: str, limit: int) -> list:
+        """
+        The `limit` largest live entries by `sort` (a PROCESS_SORT_KEYS key)
+        as (value, entry) pairs, chosen with a bounded heap rather than a
+        full sort.  Processes whose files cannot be read (another user's,
+        when not root) are left out of the fds and io_* rankings.
+        """
+        attr, reader = PROCESS_SORT_KEYS[sort]
+        if reader is not None:
+            self._fill(attr, reader)
+        entries = list(self.entries.values())
+        ranked = ((v, e) for e in entries if (v := getattr(e, attr)) is not None)
+        return heapq.nlargest(limit, ranked, key=lambda pair: pair[0])
+
+    def _fill(self, attr: str, reader) -> None:
+        """Set `attr` on every entry from `reader`, once per refresh."""
+        with self._lock:
+            if attr in self._filled:
+                return
+            for e in self.entries.values():
+                try:
+                    setattr(e, attr, reader(self.proc, e.pid))
+                except (OSError, ValueError):
+                    setattr(e, attr, None)
+            self._filled.add(attr)
+
+    def _identify(self, pid: int, comm: bytes) -> _ProcEntry | None:
+        entry = _ProcEntry(pid, comm)
+        try:
+            with open(f"{self.proc}/{pid}/cmdline", "rb") as f:
+                argv = f.read().rstrip(b"\0").split(b"\0")
+            uid = os.stat(f"{self.proc}/{pid}").st_uid
+        except OSError:
+            return None
+        name = comm.decode(errors="replace")
+        # comm is cut to 15 bytes; psutil recovers the full name from argv[0]
+        if len(comm) >= 15 and argv[0]:
+            exe = os.path.basename(argv[0].decode(errors="replace")).split(" ")[0]
+            if exe.startswith(name):
+                name = exe
+        cmd = " ".join(a.decode(errors="replace") for a in argv[:5]).strip()
+        if len(cmd) > 80:
+            cmd = cmd[:77] + "..."
+        entry.name = name
+        entry.cmd = cmd or name
+        entry.username = self._username(uid)
+        return entry
+
+    def _username(self, uid: int) -> str:
+        if uid not in self._users:
+            try:
+                self._users[uid] = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                self._users[uid] = str(uid)
+        return self._users[uid]
+
+
+def _proc_fd_count(proc: str, pid: int) -> int:
+    return len(os.listdir(f"{proc}/{pid}/fd"))
+
+
+def _proc_io_counters(proc: str, pid: str) -> tuple[int, int]:
+    """read_bytes, write_bytes of /proc/<pid>/io: bytes that hit storage."""
+    fd = os.open(f"{proc}/{pid}/io", os.O_RDONLY)
+    try:
+        data = os.read(fd, 1024)
+    finally:
+        os.close(fd)
+    # rchar, wchar, syscr, syscw, read_bytes, write_bytes, ... in that order
+    f = data.split()
+    return int(f[9]), int(f[11])
+
+
+# /api/processes sort key → (_ProcEntry attribute, reader that fills it on
+# demand once per refresh, or None when refresh() keeps it current)
+PROCESS_SORT_KEYS: dict = {
+    "cpu": ("cpu_percent", None),
+    "rss": ("rss", None),
+    "threads": ("threads", None),
+    "fds": ("fds", _proc_fd_count),
+    "io_read": ("read_rate", None),
+    "io_write": ("write_rate", None),
+}
+
+
+# ─── Login records (wtmp) ─────────────────────────────────────────────────────
+
+WTMP_PATH = "/var/log/wtmp"
+
+# struct utmp as glibc writes it on 64-bit Linux (x86_64 and aarch64):
+# type, pid, line, id, user, host, exit status, session, tv_sec, tv_usec,
+# addr_v6 and 20 reserved bytes — 384 bytes a record
+UTMP = struct.Struct("<h2xi32s4s32s256s2hi2i16s20x")
+UTMP_USER_PROCESS = 7
+
+
+def _utmp_str(raw: bytes) -> str:
+    return raw.split(b"\0", 1)[0].decode("utf-8", "replace")
+
+
+class WtmpReader:
+    """
+    The newest login sessions in a wtmp file, decoded natively instead of
+    parsing `last`.
+
+    Records are read in blocks backwards from the end of the file until
+    `count` user logins are found, so the cost does not grow with the
+    file.  The result is kept until the file's inode, size or mtime
+    changes: an unchanged wtmp costs one stat().
+    """
+
+    BLOCK = 64  # records per read (24 KB)
+
+    def __init__(self, path: str = WTMP_PATH, count: int = 5) -> None:
+        self.path = path
+        self.count = count
+        self._key: tuple | None = None
+        self._logins: list = []
+
+    def logins(self) -> list:
+        try:
+            st = os.stat(self.path)
+            key = (st.st_ino, st.st_size, st.st_mtime_ns)
+            if key != self._key:
+                self._logins = self._read(st.st_size)
+                self._key = key
+        except OSError:
+            self._key, self._logins = None, []
+        return self._logins
+
+    def _read(self, size: int) -> list:
+        logins: list = []
+        end = size - size % UTMP.size  # ignore a torn record being appended
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            while end > 0 and len(logins) < self.count:
+                start = max(0, end - self.BLOCK * UTMP.size)
+                block = os.pread(fd, end - start, start)
+                block = block[: len(block) - len(block) % UTMP.size]
+                for rec in reversed(list(UTMP.iter_unpack(block))):
+                    if rec[0] == UTMP_USER_PROCESS and rec[4].strip(b"\0"):
+                        logins.append(self._login(rec))
+                        if len(logins) == self.count:
+                            break
+                end = start
+        finally:
+            os.close(fd)
+        return logins
+
+    @staticmethod
+    def _login(rec: tuple) -> dict:
+        _, _, line, _, user, host, _, _, _, tv_sec, _, _ = rec
+        return {
+            "user": html.escape(_utmp_str(user)),
+            "terminal": html.escape(_utmp_str(line)),
+            "host": html.escape(_utmp_str(host)),
+            "date": time.strftime("%a %b %d %H:%M", time.localtime(tv_sec)),
+            "login_time": tv_sec,
+        }
+
+
+# ─── Encoded responses ────────────────────────────────────────────────────────
+
+# Bodies smaller than this are not worth a Content-Encoding
+COMPRESS_MIN_BYTES = 512
+
+# content-coding → (fast compressor, best-ratio compressor for static assets)
+COMPRESSORS: dict = {
+    "gzip": (
+        lambda b: gzip.compress(b, compresslevel=6, mtime=0),
+        lambda b: gzip.compress(b, compresslevel=9, mtime=0),
+    ),
+}
+if brotli is not None:
+    COMPRESSORS = {
+        "br": (
+            lambda b: brotli.compress(b, quality=5),
+            lambda b: brotli.compress(b, quality=11),
+        ),
+        **COMPRESSORS,
+    }
+
+
+class EncodedBody:
+    """
+    A response body serialized once and compressed at most once per
+    content-coding, shared by every request that serves it.
+
+    Snapshots compress lazily on the first request that asks for a coding;
+    static assets pass precompress=True to pay the (best-ratio) cost at
+    startup.  The ETag is a hash of the identity bytes, suffixed per coding.
+    """
+
+    __slots__ = ("content_type", "etag", "_codings", "_best", "_lock")
+
+    def __init__(
+        self, body: bytes, content_type: str, precompress: bool = False
+    ) -> None:
+        self.content_type = content_type
+        self.etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        self._codings: dict = {"identity": body}
+        self._best = precompress
+        self._lock = threading.Lock()
+        if precompress:
+            for coding in COMPRESSORS:
+                self.encoded(coding)
+
+    @property
+    def identity(self) -> bytes:
+        return self._codings["identity"]
+
+    def negotiate(self, accept_encoding: str) -> str:
+        """Pick the preferred coding this body supports from Accept-Encoding."""
+        if len(self.identity) < COMPRESS_MIN_BYTES:
+            return "identity"
+        accepted: dict = {}
+        for part in accept_encoding.split(","):
+            coding, _, params = part.strip().partition(";")
+            q = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    q = float(params[2:])
+                except ValueError:
+                    q = 0.0
+            accepted[coding.strip().lower()] = q
+        for coding in COMPRESSORS:
+            if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+                return coding
+        return "identity"
+
+    def encoded(self, coding: str) -> bytes:
+        data = self._codings.get(coding)
+        if data is None:
+            with self._lock:
+                data = self._codings.get(coding)
+                if data is None:
+                    fast, best = COMPRESSORS[coding]
+                    data = (best if self._best else fast)(self.identity)
+                    self._codings[coding] = data
+        return data
+
+    def etag_for(self, coding: str) -> str:
+        return self.etag if coding == "identity" else f'{self.etag[:-1]}-{coding}"'
+
+
+# ─── OpenMetrics exposition ───────────────────────────────────────────────────
+
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+METRICS_PREFIX = "oracle_monitor"
+
+
+def _om_labels(labels: dict | None) -> str:
+    if not labels:
+        return ""
+    esc = {"\\": "\\\\", '"': '\\"', "\n": "\\n"}
+    return (
+        "{"
+        + ",".join(
+            f'{k}="' + "".join(esc.get(c, c) for c in str(v)) + '"'
+            for k, v in labels.items()
+        )
+        + "}"
+    )
+
+
+def render_openmetrics(data: dict) -> bytes:
+    """
+    The payload of one sample as OpenMetrics text, raw numbers only (the
+    *_bytes / *_total siblings, never the format_bytes strings).  Sections
+    whose collector produced nothing are left out.
+    """
+    out: list = []
+
+    def family(name: str, kind: str, help_: str, samples) -> None:
+        rows = [(lab, v) for lab, v in samples if isinstance(v, (int, float))]
+        if not rows:
+            return
+        full = f"{METRICS_PREFIX}_{name}"
+        out.append(f"# TYPE {full} {kind}\n# HELP {full} {help_}\n")
+        suffix = "_total" if kind == "counter" else ""
+        for lab, v in rows:
+            out.append(f"{full}{suffix}{_om_labels(lab)} {v!r}\n")
+
+    def one(name: str, kind: str, help_: str, value) -> None:
+        family(name, kind, help_, [(None, value)])
+
+    system = data.get("system") or {}
+    one(
+        "boot_time_seconds",
+        "gauge",
+        "Host boot time (Unix epoch).",
+        system.get("boot_time"),
+    )
+
+    cpu = data.get("cpu") or {}
+    one(
+        "cpu_usage_percent",
+        "gauge",
+        "CPU busy over the last sample.",
+        cpu.get("overall"),
+    )
+    family(
+        "cpu_core_usage_percent",
+        "gauge",
+        "Per-core CPU busy over the last sample.",
+        (({"core": i}, v) for i, v in enumerate(cpu.get("per_core") or [])),
+    )
+    family(
+        "cpu_mode_percent",
+        "gauge",
+        "CPU time split over the last sample.",
+        (({"mode": m}, v) for m, v in (cpu.get("breakdown") or {}).items()),
+    )
+    one("cpu_cores", "gauge", "Logical CPUs.", cpu.get("core_count"))
+    family(
+        "load_average",
+        "gauge",
+        "Run-queue load average.",
+        (
+            ({"period": p}, v)
+            for p, v in zip(("1m", "5m", "15m"), cpu.get("load_avg") or [])
+        ),
+    )
+
+    mem = data.get("memory") or {}
+    one("memory_total_bytes", "gauge", "Physical memory.", mem.get("total_bytes"))
+    one("memory_used_bytes", "gauge", "Memory in use.", mem.get("used_bytes"))
+    one(
+        "memory_available_bytes",
+        "gauge",
+        "Memory available without swapping.",
+        mem.get("available_bytes"),
+    )
+    one("memory_usage_percent", "gauge", "Memory in use.", mem.get("percent"))
+    one("swap_total_bytes", "gauge", "Swap space.", mem.get("swap_total_bytes"))
+    one("swap_used_bytes", "gauge", "Swap in use.", mem.get("swap_used_bytes"))
+    one("swap_usage_percent", "gauge", "Swap in use.", mem.get("swap_percent"))
+    zram = mem.get("zram") or []
+    family(
+        "zram_size_bytes",
+        "gauge",
+        "zram swap device size.",
+        (({"device": z["device"]}, z.get("total_bytes")) for z in zram),
+    )
+    family(
+        "zram_used_bytes",
+        "gauge",
+        "zram swap device use.",
+        (({"device": z["device"]}, z.get("used_bytes")) for z in zram),
+    )
+
+    disks = data.get("disk") or []
+    fs = [
+        (
+            {
+                "mountpoint": d["mountpoint"],
+                "device": d["device"],
+                "fstype": d["fstype"],
+            },
+            d,
+        )
+        for d in disks
+    ]
+    family(
+        "filesystem_size_bytes",
+        "gauge",
+        "Filesystem size.",
+        ((lab, d.get("total_bytes")) for lab, d in fs),
+    )
+    family(
+        "filesystem_used_bytes",
+        "gauge",
+        "Filesystem space used.",
+        ((lab, d.get("used_bytes")) for lab, d in fs),
+    )
+    family(
+        "filesystem_free_bytes",
+        "gauge",
+        "Filesystem space free.",
+        ((lab, d.get("free_bytes")) for lab, d in fs),
+    )
+    family(
+        "filesystem_usage_percent",
+        "gauge",
+        "Filesystem space used.",
+        ((lab, d.get("percent")) for lab, d in fs),
+    )
+
+    dio = data.get("disk_io") or {}
+    one(
+        "disk_read_bytes",
+        "counter",
+        "Bytes read from all disks.",
+        dio.get("read_bytes_total"),
+    )
+    one(
+        "disk_written_bytes",
+        "counter",
+        "Bytes written to all disks.",
+        dio.get("write_bytes_total"),
+    )
+    one(
+        "disk_reads_completed",
+        "counter",
+        "Reads completed on all disks.",
+        dio.get("read_count"),
+    )
+    one(
+        "disk_writes_completed",
+        "counter",
+        "Writes completed on all disks.",
+        dio.get("write_count"),
+    )
+    devices = [({"device": v["device"]}, v) for v in data.get("disk_devices") or []]
+    for field, name, help_ in (
+        ("read_iops", "disk_device_read_iops", "Reads completed per second."),
+        ("write_iops", "disk_device_write_iops", "Writes completed per second."),
+        (
+            "read_bytes_per_sec",
+            "disk_device_read_bytes_per_second",
+            "Bytes read per second.",
+        ),
+        (
+            "write_bytes_per_sec",
+            "disk_device_write_bytes_per_second",
+            "Bytes written per second.",
+        ),
+        (
+            "await_ms",
+            "disk_device_await_milliseconds",
+            "Average time per request, queueing included.",
+        ),
+        ("queue_depth", "disk_device_queue_depth", "Average requests in flight."),
+        (
+            "util",
+            "disk_device_utilization_percent",
+            "Share of the interval with I/O in flight.",
+        ),
+    ):
+        family(name, "gauge", help_, ((lab, v.get(field)) for lab, v in devices))
+
+    net = data.get("network") or {}
+    ifaces = [({"interface": i["name"]}, i) for i in net.get("interfaces") or []]
+    for field, name, kind, help_ in (
+        ("rx_bytes_total", "network_receive_bytes", "counter", "Bytes received."),
+        ("tx_bytes_total", "network_transmit_bytes", "counter", "Bytes sent."),
+        ("packets_recv", "network_receive_packets", "counter", "Packets received."),
+        ("packets_sent", "network_transmit_packets", "counter", "Packets sent."),
+        (
+            "rx_bytes_per_sec",
+            "network_receive_bytes_per_second",
+            "gauge",
+            "Bytes received per second.",
+        ),
+        (
+            "tx_bytes_per_sec",
+            "network_transmit_bytes_per_second",
+            "gauge",
+            "Bytes sent per second.",
+        ),
+        (
+            "rx_errors_per_sec",
+            "network_receive_errors_per_second",
+            "gauge",
+            "Receive errors per second.",
+        ),
+        (
+            "tx_errors_per_sec",
+            "network_transmit_errors_per_second",
+            "gauge",
+            "Transmit errors per second.",
+        ),
+        (
+            "rx_drops_per_sec",
+            "network_receive_drops_per_second",
+            "gauge",
+            "Receive drops per second.",
+        ),
+        (
+            "tx_drops_per_sec",
+            "network_transmit_drops_per_second",
+            "gauge",
+            "Transmit drops per second.",
+        ),
+    ):
+        family(name, kind, help_, ((lab, i.get(field)) for lab, i in ifaces))
+    for field, name, help_ in (
+        (
+            "errors_in",
+            "network_receive_errors",
+            "Receive errors, all interfaces but lo.",
+        ),
+        (
+            "errors_out",
+            "network_transmit_errors",
+            "Transmit errors, all interfaces but lo.",
+        ),
+        ("drops_in", "network_receive_drops", "Receive drops, all interfaces but lo."),
+        (
+            "drops_out",
+            "network_transmit_drops",
+            "Transmit drops, all interfaces but lo.",
+        ),
+    ):
+        one(name, "counter", help_, net.get(field))
+
+    conn = data.get("connections") or {}
+    family(
+        "tcp_connections",
+        "gauge",
+        "TCP sockets by state.",
+        (({"state": st}, n) for st, n in (conn.get("states") or {}).items()),
+    )
+    one("udp_sockets", "gauge", "Bound UDP sockets.", conn.get("udp"))
+    family(
+        "service_listening",
+        "gauge",
+        "Ports with a listening (TCP) or bound (UDP) socket.",
+        (
+            ({"port": s["port"], "proto": s["proto"], "service": s["name"]}, 1)
+            for s in data.get("services") or []
+        ),
+    )
+
+    wg = data.get("wireguard") or {}
+    one(
+        "wireguard_up",
+        "gauge",
+        "1 when a wg* interface exists.",
+        int(bool(wg.get("running"))) if wg else None,
+    )
+    peers = [
+        ({"interface": p.get("interface", ""), "peer": p["public_key"]}, p)
+        for p in wg.get("peers") or []
+    ]
+    family(
+        "wireguard_peer_last_handshake_seconds",
+        "gauge",
+        "Latest handshake (Unix epoch, 0 = never).",
+        ((lab, p.get("latest_handshake")) for lab, p in peers),
+    )
+    family(
+        "wireguard_peer_receive_bytes",
+        "counter",
+        "Bytes received from the peer.",
+        ((lab, p.get("rx_bytes")) for lab, p in peers),
+    )
+    family(
+        "wireguard_peer_transmit_bytes",
+        "counter",
+        "Bytes sent to the peer.",
+        ((lab, p.get("tx_bytes")) for lab, p in peers),
+    )
+
+    out.append("# EOF\n")
+    return "".join(out).encode()
+
+
+# ─── Metrics schema v2 ────────────────────────────────────────────────────────
+
+# Unit of every numeric field of metrics_v2(), by path ("[]" = each element)
+# v1 section names that are renamed in v2, accepted by ?fields= / ?exclude=
+V2_SECTION_ALIASES: dict = {"disk": "filesystems", "top_processes": "processes"}
+
+METRICS_V2_UNITS: dict = {
+    "timestamp": "unix_seconds",
+    "uptime": "seconds",
+    "system.boot_time": "unix_seconds",
+    "cpu.usage": "percent",
+    "cpu.per_core[]": "percent",
+    "cpu.breakdown.*": "percent",
+    "cpu.load_avg[]": "runnable_tasks",
+    "memory.total": "bytes",
+    "memory.used": "bytes",
+    "memory.available": "bytes",
+    "memory.usage": "percent",
+    "memory.swap_total": "bytes",
+    "memory.swap_used": "bytes",
+    "memory.swap_usage": "percent",
+    "memory.zram[].size": "bytes",
+    "memory.zram[].used": "bytes",
+    "memory.zram[].usage": "percent",
+    "filesystems[].size": "bytes",
+    "filesystems[].used": "bytes",
+    "filesystems[].free": "bytes",
+    "filesystems[].usage": "percent",
+    "disk_io.read_bytes": "bytes",
+    "disk_io.write_bytes": "bytes",
+    "disk_io.reads": "requests",
+    "disk_io.writes": "requests",
+    "disk_io.read_bytes_per_sec": "bytes_per_second",
+    "disk_io.write_bytes_per_sec": "bytes_per_second",
+    "disk_io.read_iops": "requests_per_second",
+    "disk_io.write_iops": "requests_per_second",
+    "disk_devices[].read_iops": "requests_per_second",
+    "disk_devices[].write_iops": "requests_per_second",
+    "disk_devices[].read_bytes_per_sec": "bytes_per_second",
+    "disk_devices[].write_bytes_per_sec": "bytes_per_second",
+    "disk_devices[].read_await_ms": "milliseconds",
+    "disk_devices[].write_await_ms": "milliseconds",
+    "disk_devices[].await_ms": "milliseconds",
+    "disk_devices[].queue_depth": "requests",
+    "disk_devices[].util": "percent",
+    "network.rx_bytes": "bytes",
+    "network.tx_bytes": "bytes",
+    "network.rx_packets": "packets",
+    "network.tx_packets": "packets",
+    "network.rx_errors": "packets",
+    "network.tx_errors": "packets",
+    "network.rx_drops": "packets",
+    "network.tx_drops": "packets",
+    "network.rx_bytes_per_sec": "bytes_per_second",
+    "network.tx_bytes_per_sec": "bytes_per_second",
+    "network.interfaces[].rx_bytes": "bytes",
+    "network.interfaces[].tx_bytes": "bytes",
+    "network.interfaces[].rx_packets": "packets",
+    "network.interfaces[].tx_packets": "packets",
+    "network.interfaces[].*_per_sec": "per_second",
+    "connections.*": "sockets",
+    "processes[].cpu_percent": "percent_of_one_cpu",
+    "processes[].memory_percent": "percent",
+    "processes[].rss": "bytes",
+    "processes[].read_bytes_per_sec": "bytes_per_second",
+    "processes[].write_bytes_per_sec": "bytes_per_second",
+    "wireguard.peers[].latest_handshake": "unix_seconds",
+    "last_logins[].login_time": "unix_seconds",
+    "wireguard.peers[].rx_bytes": "bytes",
+    "wireguard.peers[].tx_bytes": "bytes",
+}
+
+# Display strings of the v1 payload that metrics_v2() leaves out
+_V1_DISPLAY = frozenset(
+    ("total", "used", "free", "bytes_recv", "bytes_sent", "read_rate", "write_rate")
+    + ("rx_rate", "tx_rate", "handshake", "transfer")
+)
+
+
+def _raw(obj: dict, **renames) -> dict:
+    """`obj` without display strings, keys renamed old=new."""
+    return {
+        renames.get(k, k): v
+        for k, v in obj.items()
+        if k not in _V1_DISPLAY or k in renames
+    }
+
+
+def _unescaped(obj: dict, *keys: str) -> dict:
+    return {
+        k: html.unescape(v) if k in keys and isinstance(v, str) else v
+        for k, v in obj.items()
+    }
+
+
+def metrics_v2(data: dict, ts: float) -> dict:
+    """
+    The /api/v2/metrics view of one sample: raw integers and floats with
+    their units in METRICS_V2_UNITS, no format_bytes strings and no HTML
+    escaping.  Built from the v1 payload's raw fields, once per sample.
+    """
+    out: dict = {"schema": 2, "timestamp": ts, "units": METRICS_V2_UNITS}
+    system = data.get("system")
+    if system:
+        out["system"] = _unescaped(system, *system)
+        if system.get("boot_time"):
+            out["uptime"] = round(ts - system["boot_time"], 1)
+    cpu = data.get("cpu")
+    if cpu:
+        out["cpu"] = _raw(cpu, overall="usage", core_count="cores")
+    mem = data.get("memory")
+    if mem:
+        out["memory"] = {
+            "total": mem.get("total_bytes"),
+            "used": mem.get("used_bytes"),
+            "available": mem.get("available_bytes"),
+            "usage": mem.get("percent"),
+            "swap_total": mem.get("swap_total_bytes"),
+            "swap_used": mem.get("swap_used_bytes"),
+            "swap_usage": mem.get("swap_percent"),
+            "zram": [
+                _raw(z, total_bytes="size", used_bytes="used", percent="usage")
+                for z in mem.get("zram") or []
+            ],
+        }
+    if "disk" in data:
+        out["filesystems"] = [
+            _raw(
+                d,
+                total_bytes="size",
+                used_bytes="used",
+                free_bytes="free",
+                percent="usage",
+            )
+            for d in data["disk"]
+        ]
+    dio = data.get("disk_io")
+    if dio:
+        out["disk_io"] = {
+            "read_bytes": dio.get("read_bytes_total"),
+            "write_bytes": dio.get("write_bytes_total"),
+            "reads": dio.get("read_count"),
+            "writes": dio.get("write_count"),
+            "read_bytes_per_sec": dio.get("read_bytes_per_sec"),
+            "write_bytes_per_sec": dio.get("write_bytes_per_sec"),
+            "read_iops": dio.get("read_iops"),
+            "write_iops": dio.get("write_iops"),
+        }
+    if "disk_devices" in data:
+        out["disk_devices"] = [_raw(v) for v in data["disk_devices"]]
+    net = data.get("network")
+    if net:
+        out["network"] = {
+            "rx_bytes": net.get("rx_bytes_total"),
+            "tx_bytes": net.get("tx_bytes_total"),
+            "rx_packets": net.get("packets_recv"),
+            "tx_packets": net.get("packets_sent"),
+            "rx_errors": net.get("errors_in"),
+            "tx_errors": net.get("errors_out"),
+            "rx_drops": net.get("drops_in"),
+            "tx_drops": net.get("drops_out"),
+            "rx_bytes_per_sec": net.get("rx_bytes_per_sec"),
+            "tx_bytes_per_sec": net.get("tx_bytes_per_sec"),
+            "source": net.get("source"),
+            "interfaces": [
+                _raw(
+                    i,
+                    rx_bytes_total="rx_bytes",
+                    tx_bytes_total="tx_bytes",
+                    packets_recv="rx_packets",
+                    packets_sent="tx_packets",
+                )
+                for i in net.get("interfaces") or []
+            ],
+        }
+    for key in ("connections", "services", "firewall", "stale"):
+        if key in data:
+            out[key] = data[key]
+    if "top_processes" in data:
+        out["processes"] = [
+            _unescaped(p, "name", "cmd", "username") for p in data["top_processes"]
+        ]
+    wg = data.get("wireguard")
+    if wg:
+        out["wireguard"] = {**wg, "peers": [_raw(p) for p in wg.get("peers") or []]}
+    if "last_logins" in data:
+        out["last_logins"] = [
+            _unescaped(entry, *entry) for entry in data["last_logins"]
+        ]
+    if "error" in data:
+        out["error"] = data["error"]
+    return out
+
+
+# ─── Background sampler ───────────────────────────────────────────────────────
+
+
+class Snapshot(NamedTuple):
+    """
+    One published collection cycle.  Never mutated once published, except
+    the `views` cache, which is only touched under `views_lock`.
+    """
+
+    seq: int
+    monotonic: float
+    data: dict
+    body: bytes  # JSON encoding of `data`, shared by every request thread
+    response: EncodedBody  # `body` with its compressed forms and ETag
+    event: bytes  # the same body framed as one Server-Sent Event
+    patch: bytes | None  # "patch" event: json_delta from the previous snapshot
+    metrics: EncodedBody  # render_openmetrics(data) for GET /metrics
+    data_v2: dict  # metrics_v2(data)
+    v2: EncodedBody  # `data_v2` for GET /api/v2/metrics
+    views: dict  # ?fields= / ?exclude= subsets, encoded on first request
+    views_lock: threading.Lock
+
+
+# Keys that identify an element of a list of objects in the payload
+DELTA_LIST_KEYS: tuple = ("pid", "mountpoint", "port", "name", "device")
+
+
+def json_delta(old, new):
+    """
+    Delta turning JSON value `old` into `new`, or None when they are equal.
+
+    Objects follow RFC 7386 merge-patch rules: changed keys carry a nested
+    delta and removed keys are sent as null.  A value that is replaced
+    rather than patched and is itself null or an object (a key set to
+    null, a new key holding an object) is wrapped as {"$value": v}, so
+    neither is read as a deletion or a patch.  Arrays are diffed as well,
+    because top processes, interfaces and disks change a field or two per
+    sample rather than wholesale:
+
+      {"$key": "pid", "$order": [ids...], "$set": {"<id>": delta-or-item}}
+          when every element is an object with a unique DELTA_LIST_KEYS
+          field; the new array is `$order` mapped through the old elements
+          with their deltas applied (new ids carry the whole element)
+      {"$len": n, "$set": {"<index>": delta-or-item}}
+          otherwise, position by position
+
+    New elements in "$set" are sent as they are.  Anything else is replaced
+    by the new value.  apply_delta() is the inverse, and the page's
+    applyDelta() mirrors it.
+    """
+    if old == new:
+        return None
+    if isinstance(old, dict) and isinstance(new, dict):
+        patch: dict = {k: None for k in old if k not in new}
+        for k, v in new.items():
+            if k not in old:
+                patch[k] = _delta_value(v)
+            else:
+                sub = json_delta(old[k], v)
+                if sub is not None:
+                    patch[k] = sub
+        return patch
+    if isinstance(old, list) and isinstance(new, list):
+        key = _delta_list_key(old, new)
+        if key:
+            before = {item[key]: item for item in old}
+            changed: dict = {}
+            for item in new:
+                ident = item[key]
+                if ident not in before:
+                    changed[str(ident)] = item
+                else:
+                    sub = json_delta(before[ident], item)
+                    if sub is not None:
+                        changed[str(ident)] = sub
+            order = [item[key] for item in new]
+            return {"$key": key, "$order": order, "$set": changed}
+        changed = {}
+        for i, item in enumerate(new):
+            if i >= len(old):
+                changed[str(i)] = item
+            elif old[i] != item:
+                changed[str(i)] = json_delta(old[i], item)
+        return {"$len": len(new), "$set": changed}
+    return _delta_value(new)
+
+
+def _delta_value(value):
+    return {"$value": value} if value is None or isinstance(value, dict) else value
+
+
+def apply_delta(target, patch):
+    """Apply a json_delta() patch to `target` (the page's applyDelta)."""
+    if not isinstance(patch, dict):
+        return patch
+    if "$value" in patch:
+        return patch["$value"]
+    if isinstance(target, list) and ("$key" in patch or "$len" in patch):
+        changed = patch["$set"]
+        if "$key" in patch:
+            before = {str(item[patch["$key"]]): item for item in target}
+            ids = [str(ident) for ident in patch["$order"]]
+        else:
+            before = {str(i): item for i, item in enumerate(target)}
+            ids = [str(i) for i in range(patch["$len"])]
+        out = []
+        for k in ids:
+            if k not in before:
+                out.append(changed[k])  # new element, sent whole
+            elif k in changed:
+                out.append(apply_delta(before[k], changed[k]))
+            else:
+                out.append(before[k])
+        return out
+    out = dict(target) if isinstance(target, dict) else {}
+    for k, v in patch.items():
+        if v is None:
+            out.pop(k, None)
         else:
-            self.send_response(404)
-            self.end_headers()
+            out[k] = apply_delta(out.get(k), v)
+    return out
+
+
+def _delta_list_key(old: list, new: list) -> str | None:
+    items = old + new
+    if not items or not all(isinstance(i, dict) for i in items):
+        return None
+    for key in DELTA_LIST_KEYS:
+        # ids travel as strings, so they must be scalars unique as strings
+        if all(type(i.get(key)) in (int, str) for i in items) and all(
+            len({str(i[key]) for i in lst}) == len(lst) for lst in (old, new)
+        ):
+            return key
+    return None
+
+
+# /proc/net/dev counters tracked per interface, in _read_proc_net_dev's keys
+NET_COUNTERS: tuple = (
+    "bytes_recv",
+    "bytes_sent",
+    "packets_recv",
+    "packets_sent",
+    "errin",
+    "errout",
+    "dropin",
+    "dropout",
+)
+
+# Most interfaces given rates; the rest (veth storms) only report totals.
+# Host interfaces are served first, container plumbing after.
+NET_IFACE_LIMIT = 512
+_CONTAINER_IFACE = re.compile(r"docker|br-|veth")
+
+
+class MetricsCollector:
+    """
+    Single background sampler that decouples collection from HTTP requests.
+
+    One daemon thread runs get_system_metrics() every `interval` seconds and
+    publishes the result as an immutable Snapshot.  Request threads only read
+    the latest published reference (an atomic swap), so the cost of a request
+    is flat no matter how many browser tabs are polling, and the cost of
+    collection scales with the sampling interval instead of with viewers.
+
+    Within a sample, collectors that can block run on a small bounded pool
+    under a single deadline (see _collect_pooled), so one hung fork can no
+    longer hold up the whole payload.
+    """
+
+    # Collectors that can block (forks, full /proc walks): key → method name
+    POOLED_COLLECTORS: tuple = (
+        ("disk", "get_disk_metrics"),
+        ("disk_io", "_get_disk_io"),
+        ("disk_devices", "get_disk_devices"),
+        ("network", "get_network_metrics"),
+        ("connections", "get_connection_counts"),
+        ("top_processes", "get_top_processes"),
+        ("services", "get_detected_services"),
+        ("firewall", "get_firewall_status"),
+        ("wireguard", "get_wireguard_status"),
+        ("last_logins", "get_last_logins"),
+    )
+
+    def __init__(
+        self,
+        interval: float = 3.0,
+        deadline: float = 2.0,
+        workers: int = 4,
+        history_hours: float = 24.0,
+        history_dir: str | None = None,
+    ) -> None:
+        self.interval = interval
+        self.deadline = deadline
+        capacity = int(history_hours * 3600 / interval)
+        try:
+            self.history = MetricHistory(interval, capacity, history_dir)
+        except OSError as exc:
+            print(f"WARNING: cannot persist history ({exc}); keeping it in memory")
+            self.history = MetricHistory(interval, capacity)
+        self._snapshot: Snapshot | None = None
+        self._seq = 0
+        self._cycle = 0  # collection cycles started (see scan_sockets)
+        self._published = threading.Condition()
+        self._subscribers: list = []  # called with each new snapshot
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        # Bounded pool for POOLED_COLLECTORS, with their in-flight futures and
+        # last successful results (keyed by payload key)
+        self._pool = futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="collector"
+        )
+        self._inflight: dict[str, futures.Future] = {}
+        self._last_good: dict = {}
+
+        # Results of @cached collectors, keyed by method name
+        self._cache: dict[str, _CacheEntry] = {}
+        self._cache_lock = threading.Lock()
+
+        # Previous counters, one CounterRates per source: /proc/stat jiffies
+        # per CPU, disk totals, /proc/diskstats per device, /proc/net/dev per
+        # interface (per-process counters live in the ProcessIndex)
+        self._cpu_ticks = CounterRates()
+        self._disk_totals = CounterRates(min_interval=0.5)
+        self._disk_devices = CounterRates()
+        self._net_ifaces = CounterRates(
+            min_interval=0.5, limit=NET_IFACE_LIMIT, on_drop="wrap"
+        )
+
+        # Processes seen by get_top_processes (one refresh in flight at a time)
+        self._processes = ProcessIndex()
+        self._wtmp = WtmpReader()
+
+        # Latest scan_sockets() result and the cycle it belongs to
+        self._socket_scan: tuple = (0, None)
+        self._socket_scan_lock = threading.Lock()
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.history.flush()
+
+    def _run(self) -> None:
+        # Baseline for per-process CPU%, so the first published sample already
+        # measures a real interval instead of each process's lifetime
+        self._processes.refresh()
+        self._stop.wait(PROCESS_WARMUP)
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.sample_once()
+            except Exception:
+                # Keep sampling: a dead thread would freeze every endpoint on
+                # the last snapshot and starve the streams
+                print("ERROR: metrics sample failed; retrying next interval")
+                traceback.print_exc()
+            elapsed = time.monotonic() - started
+            self._stop.wait(max(0.0, self.interval - elapsed))
+
+    # ── Publishing ────────────────────────────────────────────────────────────
+
+    def sample_once(self) -> Snapshot:
+        """Collect, encode once and publish a new snapshot."""
+        self._cycle += 1
+        data = self.get_system_metrics()
+        now = time.time()
+        self.history.record(now, data)
+        self._seq += 1
+        body = json.dumps(data).encode()
+        data_v2 = metrics_v2(data, now)
+        prev = self._snapshot
+        patch = None
+        if prev is not None:
+            diff = json.dumps(json_delta(prev.data, data) or {})
+            # Round trip as a viewer would, on the JSON rather than the Python
+            # objects; should it ever disagree, viewers get full events
+            patched = apply_delta(json.loads(prev.body), json.loads(diff))
+            if patched == json.loads(body):
+                patch = b"event: patch\nid: %d\ndata: %s\n\n" % (
+                    self._seq,
+                    b'{"base": %d, "patch": %s}' % (prev.seq, diff.encode()),
+                )
+        snap = Snapshot(
+            seq=self._seq,
+            monotonic=time.monotonic(),
+            data=data,
+            body=body,
+            response=EncodedBody(body, "application/json"),
+            event=b"id: %d\ndata: %s\n\n" % (self._seq, body),
+            patch=patch,
+            metrics=EncodedBody(render_openmetrics(data), OPENMETRICS_TYPE),
+            data_v2=data_v2,
+            v2=EncodedBody(json.dumps(data_v2).encode(), "application/json"),
+            views={},
+            views_lock=threading.Lock(),
+        )
+        with self._published:
+            self._snapshot = snap
+            self._published.notify_all()
+        for notify in list(self._subscribers):
+            notify(snap)
+        return snap
+
+    def subscribe(self, notify) -> None:
+        """Call `notify(snapshot)` from the sampler thread on every publish."""
+        self._subscribers.append(notify)
+
+    def unsubscribe(self, notify) -> None:
+        if notify in self._subscribers:
+            self._subscribers.remove(notify)
+
+    def latest(self, timeout: float | None = None) -> Snapshot | None:
+        """Return the newest snapshot, waiting up to `timeout` for the first."""
+        if self._snapshot is None:
+            with self._published:
+                self._published.wait_for(lambda: self._snapshot, timeout)
+        return self._snapshot
+
+    def wait_next(self, seen: int | None, timeout: float) -> Snapshot | None:
+        """
+        Block until a snapshot other than sequence `seen` is published and
+        return it, or None after `timeout`.  A stale or unknown `seen` (for
+        example an event id from before a restart) returns the latest at once.
+        """
+        with self._published:
+            self._published.wait_for(
+                lambda: self._snapshot and self._snapshot.seq != seen, timeout
+            )
+            snap = self._snapshot
+        return snap if snap and snap.seq != seen else None
+
+    # ── Cache plumbing ────────────────────────────────────────────────────────
+
+    def _refresh_cached(self, key: str, fn, ttl: float | None):
+        """Run a @cached collector and store its result (see cached())."""
+        try:
+            value = fn(self)
+        except Exception:
+            with self._cache_lock:
+                entry = self._cache.get(key)
+                if entry is None:
+                    raise
+                entry.refreshing = False  # keep serving the stale value
+                return entry.value
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._cache_lock:
+            self._cache[key] = _CacheEntry(value, expires)
+        return value
 
     # =========================================================================
     # Metrics orchestrator
@@ -130,24 +2072,11 @@ class MonitorHandler(BaseHTTPRequestHandler):
         m: dict = {}
         try:
             # ── System info ───────────────────────────────────────────────────
-            m["system"] = {
-                "hostname": html.escape(socket.gethostname()),
-                "platform": html.escape(self.get_os_info()),
-                "kernel": html.escape(os.uname().release),
-                "architecture": html.escape(os.uname().machine),
-            }
+            m["system"] = self.get_system_info()
             m["uptime"] = self.format_uptime(time.time() - psutil.boot_time())
 
             # ── CPU ───────────────────────────────────────────────────────────
-            cpu_pct = psutil.cpu_percent(interval=0.1, percpu=True)
-            m["cpu"] = {
-                "overall": round(sum(cpu_pct) / len(cpu_pct), 1) if cpu_pct else 0,
-                "per_core": [round(c, 1) for c in cpu_pct],
-                "core_count": psutil.cpu_count(),
-                "load_avg": [round(x, 2) for x in os.getloadavg()]
-                if hasattr(os, "getloadavg")
-                else [0, 0, 0],
-            }
+            m["cpu"] = self.get_cpu_metrics()
 
             # ── Memory ────────────────────────────────────────────────────────
             mem = psutil.virtual_memory()
@@ -157,48 +2086,20 @@ class MonitorHandler(BaseHTTPRequestHandler):
                 "used": self.format_bytes(mem.used),
                 "free": self.format_bytes(mem.available),
                 "percent": mem.percent,
+                "total_bytes": mem.total,
+                "used_bytes": mem.used,
+                "available_bytes": mem.available,
                 "swap_total": self.format_bytes(swap.total),
                 "swap_used": self.format_bytes(swap.used),
                 "swap_percent": swap.percent,
+                "swap_total_bytes": swap.total,
+                "swap_used_bytes": swap.used,
                 "zram": self.get_zram_info(),
             }
 
-            # ── Disk ──────────────────────────────────────────────────────────
-            m["disk"] = self.get_disk_metrics()
-            m["disk_io"] = self._get_disk_io()
-
-            # ── Network (host-scoped via /proc/1/net/dev) ─────────────────────
-            m["network"] = self.get_network_metrics()
-
-            # ── TCP connections ────────────────────────────────────────────────
-            try:
-                conns = psutil.net_connections(kind="inet")
-                m["connections"] = {
-                    "established": sum(1 for c in conns if c.status == "ESTABLISHED"),
-                    "listen": sum(1 for c in conns if c.status == "LISTEN"),
-                    "time_wait": sum(1 for c in conns if c.status == "TIME_WAIT"),
-                    "total": len(conns),
-                }
-            except (psutil.AccessDenied, PermissionError):
-                m["connections"] = {
-                    "established": 0,
-                    "listen": 0,
-                    "time_wait": 0,
-                    "total": 0,
-                }
-
-            # ── Top processes (all host PIDs via pid:host) ────────────────────
-            m["top_processes"] = self.get_top_processes()
-
-            # ── Service detection (listening-port based, no systemd) ──────────
-            m["services"] = self.get_detected_services()
-
-            # ── Firewall & WireGuard ───────────────────────────────────────────
-            m["firewall"] = self.get_firewall_status()
-            m["wireguard"] = self.get_wireguard_status()
-
-            # ── Last logins ───────────────────────────────────────────────────
-            m["last_logins"] = self.get_last_logins()
+            # ── Disk, network, processes, services, firewall, WireGuard,
+            #    logins: fanned out on the pool under one deadline ───────────
+            m.update(self._collect_pooled())
 
             m["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -207,10 +2108,63 @@ class MonitorHandler(BaseHTTPRequestHandler):
 
         return m
 
+    def _collect_pooled(self) -> dict:
+        """
+        Run the blocking collectors concurrently and wait at most `deadline`
+        seconds for all of them.
+
+        A collector that misses the deadline keeps running in the background
+        and is not resubmitted while still in flight.  Its last good value is
+        served instead: dict results gain "stale": true, and every late key
+        is listed in the top-level "stale" array.  A collector that has never
+        produced a value is awaited, so the first sample is always complete.
+        """
+        jobs: list = []
+        for key, method in self.POOLED_COLLECTORS:
+            fut = self._inflight.get(key)
+            if fut is None or fut.done():
+                fut = self._pool.submit(getattr(self, method))
+                fut.add_done_callback(functools.partial(self._store_result, key))
+                self._inflight[key] = fut
+            jobs.append((key, fut))
+
+        futures.wait([fut for _, fut in jobs], timeout=self.deadline)
+
+        out: dict = {}
+        stale: list = []
+        for key, fut in jobs:
+            if not fut.done() and key not in self._last_good:
+                futures.wait([fut])
+            if fut.done() and (fut.exception() is None or key not in self._last_good):
+                out[key] = fut.result()  # re-raises a first-ever failure
+                continue
+            last = self._last_good[key]
+            out[key] = {**last, "stale": True} if isinstance(last, dict) else last
+            stale.append(key)
+        if stale:
+            out["stale"] = stale
+        return out
+
+    def _store_result(self, key: str, fut: futures.Future) -> None:
+        if not fut.cancelled() and fut.exception() is None:
+            self._last_good[key] = fut.result()
+
     # =========================================================================
     # OS / host-root helpers
     # =========================================================================
 
+    @cached(ttl=300)
+    def get_system_info(self) -> dict:
+        uname = os.uname()
+        return {
+            "hostname": html.escape(socket.gethostname()),
+            "platform": html.escape(self.get_os_info()),
+            "kernel": html.escape(uname.release),
+            "architecture": html.escape(uname.machine),
+            "boot_time": psutil.boot_time(),
+        }
+
+    @cached(ttl=None)
     def get_os_info(self) -> str:
         try:
             with open("/etc/os-release") as f:
@@ -225,6 +2179,79 @@ class MonitorHandler(BaseHTTPRequestHandler):
         """Return '/rootfs' when the host filesystem is bind-mounted there."""
         return "/rootfs" if os.path.isdir("/rootfs/etc") else ""
 
+    # =========================================================================
+    # CPU  — /proc/stat jiffy deltas against the previous sample
+    # =========================================================================
+
+    def _read_proc_stat(self) -> dict:
+        """
+        Parse the cpu lines of /proc/stat.
+        Returns {"cpu": (user, nice, system, idle, iowait, irq, softirq, steal),
+                 "cpu0": (...), ...}; guest time is already folded into user.
+        """
+        ticks: dict = {}
+        try:
+            with open("/proc/stat", "rb") as f:
+                for line in f:
+                    if not line.startswith(b"cpu"):
+                        break
+                    v = line.split()
+                    ticks[v[0].decode()] = tuple(map(int, v[1:9]))
+        except Exception:
+            pass
+        return ticks
+
+    def get_cpu_metrics(self) -> dict:
+        """
+        CPU utilisation without blocking the caller.
+
+        psutil.cpu_percent(interval=0.1) sleeps for 100 ms per call.  Instead
+        the collector keeps the previous /proc/stat sample and works from
+        the jiffy deltas, which also gives a user/system/iowait/steal split
+        (steal is what a noisy neighbour on a shared OCI shape costs you).
+        The very first sample is measured against boot, so it is never empty.
+        """
+        now = time.clock_gettime(time.CLOCK_BOOTTIME)
+        ticks = self._read_proc_stat()
+        self._cpu_ticks.retain(ticks)
+
+        def usage(name: str) -> tuple[float, dict]:
+            _, d = self._cpu_ticks.update(name, ticks[name], now, since=(0.0, (0,) * 8))
+            total = sum(d)
+            if not total:
+                return 0.0, {}
+            user, nice, system, idle, iowait, irq, softirq, steal = d
+
+            def pct(x: int) -> float:
+                return round(x * 100 / total, 1)
+
+            return pct(total - idle - iowait), {
+                "user": pct(user + nice),
+                "system": pct(system + irq + softirq),
+                "iowait": pct(iowait),
+                "steal": pct(steal),
+                "idle": pct(idle),
+            }
+
+        if "cpu" in ticks:
+            overall, breakdown = usage("cpu")
+            cores = sorted((k for k in ticks if k != "cpu"), key=lambda k: int(k[3:]))
+            per_core = [usage(k)[0] for k in cores]
+        else:  # no /proc/stat: psutil's non-blocking form (since last call)
+            per_core = [round(c, 1) for c in psutil.cpu_percent(percpu=True)]
+            overall = round(sum(per_core) / len(per_core), 1) if per_core else 0
+            breakdown = {}
+
+        return {
+            "overall": overall,
+            "per_core": per_core,
+            "breakdown": breakdown,
+            "core_count": psutil.cpu_count(),
+            "load_avg": [round(x, 2) for x in os.getloadavg()]
+            if hasattr(os, "getloadavg")
+            else [0, 0, 0],
+        }
+
     # =========================================================================
     # Disk metrics  (identical logic to bare-metal version — already correct)
     # =========================================================================
@@ -280,6 +2307,9 @@ class MonitorHandler(BaseHTTPRequestHandler):
                                     "used": self.format_bytes(u.used),
                                     "free": self.format_bytes(u.free),
                                     "percent": u.percent,
+                                    "total_bytes": u.total,
+                                    "used_bytes": u.used,
+                                    "free_bytes": u.free,
                                 }
                             )
                         except (PermissionError, FileNotFoundError, OSError):
@@ -302,6 +2332,9 @@ class MonitorHandler(BaseHTTPRequestHandler):
                             "used": self.format_bytes(u.used),
                             "free": self.format_bytes(u.free),
                             "percent": u.percent,
+                            "total_bytes": u.total,
+                            "used_bytes": u.used,
+                            "free_bytes": u.free,
                         }
                     )
                 except (PermissionError, OSError):
@@ -310,18 +2343,102 @@ class MonitorHandler(BaseHTTPRequestHandler):
         return disk_usage
 
     def _get_disk_io(self) -> dict | None:
+        """
+        Lifetime disk counters plus throughput and IOPS against the previous
+        sample held by the collector.
+        """
         try:
             d = psutil.disk_io_counters()
-            if d:
-                return {
-                    "read_bytes": self.format_bytes(d.read_bytes),
-                    "write_bytes": self.format_bytes(d.write_bytes),
-                    "read_count": d.read_count,
-                    "write_count": d.write_count,
-                }
         except Exception:
+            d = None
+        if not d:
+            return None
+        counters = (d.read_bytes, d.write_bytes, d.read_count, d.write_count)
+        read_rate, write_rate, read_iops, write_iops = self._disk_totals.rates(
+            "all", counters, time.monotonic()
+        )
+        return {
+            "read_bytes": self.format_bytes(d.read_bytes),
+            "write_bytes": self.format_bytes(d.write_bytes),
+            "read_count": d.read_count,
+            "write_count": d.write_count,
+            "read_bytes_total": d.read_bytes,
+            "write_bytes_total": d.write_bytes,
+            "read_rate": self.format_bytes(read_rate) + "/s",
+            "write_rate": self.format_bytes(write_rate) + "/s",
+            "read_bytes_per_sec": round(read_rate, 1),
+            "write_bytes_per_sec": round(write_rate, 1),
+            "read_iops": round(read_iops, 1),
+            "write_iops": round(write_iops, 1),
+        }
+
+    def _read_diskstats(self) -> dict:
+        """
+        /proc/diskstats for whole block devices (those in /sys/block) that
+        have done any I/O since boot.  Returns {name: (reads, read_sectors,
+        read_ms, writes, write_sectors, write_ms, io_ms, weighted_ms)}.
+        """
+        try:
+            whole = set(os.listdir("/sys/block"))
+        except OSError:
+            whole = None
+        stats: dict = {}
+        try:
+            with open("/proc/diskstats", "rb") as f:
+                for line in f:
+                    v = line.split()
+                    name = v[2].decode()
+                    if len(v) < 14 or (whole is not None and name not in whole):
+                        continue
+                    c = tuple(map(int, v[3:14]))
+                    if c[0] or c[4]:
+                        stats[name] = (c[0], c[2], c[3], c[4], c[6], c[7], c[9], c[10])
+        except OSError:
             pass
-        return None
+        return stats
+
+    def get_disk_devices(self) -> list:
+        """
+        Per-device equivalent of `iostat -x`, from /proc/diskstats deltas
+        against the previous sample held by the collector (the first sample
+        is measured since boot, so it is never empty).
+
+          *_iops      completed requests per second
+          await_ms    average time per request, queueing included
+          queue_depth average requests in flight (iostat aqu-sz)
+          util        % of the interval the device had I/O in flight
+        """
+        now = time.clock_gettime(time.CLOCK_BOOTTIME)
+        stats = self._read_diskstats()
+        self._disk_devices.retain(stats)
+
+        devices: list = []
+        for name, cur in sorted(stats.items()):
+            dt, delta = self._disk_devices.update(name, cur, now, since=(0.0, (0,) * 8))
+            if not dt:
+                continue
+            reads, rsect, rms, writes, wsect, wms, io_ms, weighted = delta
+            read_rate = rsect * 512 / dt
+            write_rate = wsect * 512 / dt
+            devices.append(
+                {
+                    "device": name,
+                    "read_iops": round(reads / dt, 1),
+                    "write_iops": round(writes / dt, 1),
+                    "read_rate": self.format_bytes(read_rate) + "/s",
+                    "write_rate": self.format_bytes(write_rate) + "/s",
+                    "read_bytes_per_sec": round(read_rate, 1),
+                    "write_bytes_per_sec": round(write_rate, 1),
+                    "read_await_ms": round(rms / reads, 2) if reads else 0.0,
+                    "write_await_ms": round(wms / writes, 2) if writes else 0.0,
+                    "await_ms": round((rms + wms) / (reads + writes), 2)
+                    if reads + writes
+                    else 0.0,
+                    "queue_depth": round(weighted / (dt * 1000), 2),
+                    "util": round(min(100.0, io_ms / (dt * 10)), 1),
+                }
+            )
+        return devices
 
     # =========================================================================
     # ZRAM
@@ -344,6 +2461,8 @@ class MonitorHandler(BaseHTTPRequestHandler):
                                 "percent": round(used_kb / size_kb * 100, 1)
                                 if size_kb
                                 else 0,
+                                "total_bytes": size_kb * 1024,
+                                "used_bytes": used_kb * 1024,
                             }
                         )
         except Exception:
@@ -394,8 +2513,8 @@ class MonitorHandler(BaseHTTPRequestHandler):
           host init process and lives in the host network namespace, so
           /proc/1/net/dev contains the real host interface counters.
 
-        Real-time RX/TX rate is calculated from a class-level snapshot that
-        persists between the 3-second API poll intervals.
+        Real-time rates are calculated per interface against the previous
+        sample held by the collector (see _interface_rates).
         """
         now = time.monotonic()
 
@@ -434,29 +2553,41 @@ class MonitorHandler(BaseHTTPRequestHandler):
             agg["dropin"] += s["dropin"]
             agg["dropout"] += s["dropout"]
 
-        # Real-time bandwidth from class-level snapshot
-        rx_rate = tx_rate = 0.0
-        cls = MonitorHandler
-        if cls._prev_net_ts is not None:
-            dt = now - cls._prev_net_ts
-            if dt >= 0.5:  # ignore sub-half-second jitter
-                rx_rate = max(0.0, (agg["recv"] - cls._prev_net_bytes["recv"]) / dt)
-                tx_rate = max(0.0, (agg["sent"] - cls._prev_net_bytes["sent"]) / dt)
-        cls._prev_net_bytes = {"recv": agg["recv"], "sent": agg["sent"]}
-        cls._prev_net_ts = now
+        # Per-interface rates; the aggregate is their sum, so interfaces that
+        # come and go (veths, wg0 down/up) cannot make it jump or go negative
+        rates = self._interface_rates(iface_stats, now)
+        rx_rate = sum(r[0] for i, r in rates.items() if i != "lo")
+        tx_rate = sum(r[1] for i, r in rates.items() if i != "lo")
 
         # Per-interface breakdown (no loopback)
-        interfaces = [
-            {
+        interfaces = []
+        for iface, s in sorted(iface_stats.items()):
+            if iface == "lo":
+                continue
+            row = {
                 "name": iface,
                 "bytes_recv": self.format_bytes(s["bytes_recv"]),
                 "bytes_sent": self.format_bytes(s["bytes_sent"]),
                 "packets_recv": s["packets_recv"],
                 "packets_sent": s["packets_sent"],
+                "rx_bytes_total": s["bytes_recv"],
+                "tx_bytes_total": s["bytes_sent"],
             }
-            for iface, s in sorted(iface_stats.items())
-            if iface != "lo"
-        ]
+            r = rates.get(iface)
+            if r is not None:
+                row.update(
+                    rx_rate=self.format_bytes(r[0]) + "/s",
+                    tx_rate=self.format_bytes(r[1]) + "/s",
+                    rx_bytes_per_sec=round(r[0], 1),
+                    tx_bytes_per_sec=round(r[1], 1),
+                    rx_packets_per_sec=round(r[2], 1),
+                    tx_packets_per_sec=round(r[3], 1),
+                    rx_errors_per_sec=round(r[4], 2),
+                    tx_errors_per_sec=round(r[5], 2),
+                    rx_drops_per_sec=round(r[6], 2),
+                    tx_drops_per_sec=round(r[7], 2),
+                )
+            interfaces.append(row)
 
         return {
             "bytes_recv": self.format_bytes(agg["recv"]),
@@ -467,16 +2598,39 @@ class MonitorHandler(BaseHTTPRequestHandler):
             "errors_out": agg["errout"],
             "drops_in": agg["dropin"],
             "drops_out": agg["dropout"],
+            "rx_bytes_total": agg["recv"],
+            "tx_bytes_total": agg["sent"],
             "rx_rate": self.format_bytes(rx_rate) + "/s",
             "tx_rate": self.format_bytes(tx_rate) + "/s",
+            "rx_bytes_per_sec": round(rx_rate, 1),
+            "tx_bytes_per_sec": round(tx_rate, 1),
             "interfaces": interfaces,
             "source": source,  # 'host' or 'container'
         }
 
+    def _interface_rates(self, iface_stats: dict, now: float) -> dict:
+        """
+        Per-second rates of NET_COUNTERS for each interface, as tuples in
+        NET_COUNTERS order, from the per-interface state table.
+
+        Series for interfaces missing from this sample are dropped, so
+        vanished interfaces are forgotten at once and the table never holds
+        more than NET_IFACE_LIMIT entries.  An interface seen for the first
+        time reports zero until it has a baseline.
+        """
+        rates: dict[str, tuple] = {}
+        ranked = sorted(iface_stats, key=lambda i: (bool(_CONTAINER_IFACE.match(i)), i))
+        self._net_ifaces.retain(ranked[:NET_IFACE_LIMIT])
+        for iface in ranked[:NET_IFACE_LIMIT]:
+            cur = tuple(iface_stats[iface][k] for k in NET_COUNTERS)
+            rates[iface] = self._net_ifaces.rates(iface, cur, now)
+        return rates
+
     # =========================================================================
     # Service detection  — /proc/1/net/{tcp,tcp6,udp,udp6}
     # =========================================================================
 
+    @cached(ttl=10, stale_while_revalidate=True)
     def get_detected_services(self) -> list:
         """
         Auto-detect running services by scanning listening sockets in the host's
@@ -485,54 +2639,96 @@ class MonitorHandler(BaseHTTPRequestHandler):
 
         TCP  LISTEN state  = 0A
         UDP  bound sockets = 07  (UDP has no connection state)
+
+        The tables are read by scan_sockets(), the same pass that feeds the
+        connection counter.
         """
-        seen_ports: set = set()
-        detected: list = []
+        detected = [
+            {
+                "port": port,
+                "proto": proto,
+                "name": PORT_TO_SERVICE.get(port, f"Port {port}"),
+            }
+            for port, proto in self.scan_sockets().listening.items()
+        ]
+        detected.sort(key=lambda x: x["port"])
+        return detected
 
-        def parse_listening(path: str, is_udp: bool) -> list[int]:
-            want = "07" if is_udp else "0a"
-            ports: list[int] = []
-            try:
-                with open(path) as f:
-                    for line in f.readlines()[1:]:
-                        cols = line.split()
-                        if len(cols) < 4:
-                            continue
-                        if cols[3].lower() != want:
-                            continue
-                        port_hex = cols[1].split(":")[1]
-                        port = int(port_hex, 16)
-                        if 0 < port < 65536:
-                            ports.append(port)
-            except Exception:
-                pass
-            return ports
+    # =========================================================================
+    # TCP connections
+    # =========================================================================
 
-        for proto, is_udp in (
-            ("tcp", False),
-            ("tcp6", False),
-            ("udp", True),
-            ("udp6", True),
-        ):
-            # Try host namespace first, fall back to container namespace
-            for base in ("/proc/1/net", "/proc/net"):
-                path = f"{base}/{proto}"
-                if not os.path.exists(path):
-                    continue
-                for port in parse_listening(path, is_udp):
-                    if port not in seen_ports:
-                        seen_ports.add(port)
-                        detected.append(
-                            {
-                                "port": port,
-                                "proto": "UDP" if is_udp else "TCP",
-                                "name": PORT_TO_SERVICE.get(port, f"Port {port}"),
-                            }
-                        )
-                break  # stop after first working base path
+    def get_connection_counts(self) -> dict:
+        """
+        Count sockets per TCP state (all 11) plus bound UDP sockets.
 
-        detected.sort(key=lambda x: x["port"])
-        return detected
+        psutil.net_connections() walks every /proc/<pid>/fd to map inodes to
+        PIDs only for us to throw that away; counting needs the socket
+        tables alone, so cost is proportional to sockets, not sockets × fds.
+
+        NETLINK_SOCK_DIAG answers for the caller's network namespace, which
+        is the host's only on bare metal or with network_mode: host.  When
+        PID 1 lives in another namespace (the usual pid: host container) the
+        host tables are streamed from /proc/1/net/{tcp,tcp6,udp,udp6}.
+        """
+        counts = None
+        source = "proc"  # see scan_sockets()
+        if self._shares_host_netns():
+            try:
+                counts = self._count_sockets_netlink()
+                source = "netlink"
+            except OSError:
+                counts = None
+        if counts is None:
+            counts = self._count_sockets_proc()
+        tcp, udp = counts
+        states = {name: tcp.get(code, 0) for code, name in TCP_STATES.items()}
+        return {
+            "established": states["ESTABLISHED"],
+            "listen": states["LISTEN"],
+            "time_wait": states["TIME_WAIT"],
+            "udp": udp,
+            "total": sum(states.values()) + udp,
+            "states": states,
+            "source": source,
+        }
+
+    @cached(ttl=None)
+    def _shares_host_netns(self) -> bool:
+        try:
+            return (
+                os.stat("/proc/1/ns/net").st_ino == os.stat("/proc/self/ns/net").st_ino
+            )
+        except OSError:
+            return False
+
+    def _count_sockets_netlink(self) -> tuple[dict, int]:
+        """({state code: count} for TCP, UDP socket count) via sock_diag dumps."""
+        tcp: dict = {}
+        udp = 0
+        for family in (socket.AF_INET, socket.AF_INET6):
+            for state, n in _sock_diag_states(family, socket.IPPROTO_TCP).items():
+                tcp[state] = tcp.get(state, 0) + n
+            udp += sum(_sock_diag_states(family, socket.IPPROTO_UDP).values())
+        return tcp, udp
+
+    def _count_sockets_proc(self) -> tuple[dict, int]:
+        """Same as _count_sockets_netlink, from the shared /proc table scan."""
+        scan = self.scan_sockets()
+        return scan.tcp_states, scan.udp
+
+    def scan_sockets(self) -> SocketScan:
+        """
+        One streamed pass over the host socket tables per collection cycle.
+        The connection counter and the services refresh thread share it:
+        whichever asks first scans, the other waits for that result.
+        """
+        with self._socket_scan_lock:
+            cycle, scan = self._socket_scan
+            if scan is None or cycle != self._cycle:
+                scan = scan_socket_tables()
+                self._socket_scan = (self._cycle, scan)
+            return scan
 
     # =========================================================================
     # Top processes  — all host PIDs via pid:host
@@ -547,54 +2743,54 @@ class MonitorHandler(BaseHTTPRequestHandler):
              (it needs two measurements to establish a baseline).
           2. The original code filtered with `if cpu_percent > 0`, so on the very
              first poll ALL processes were silently dropped.
-          3. From the second poll onward psutil's internal Process cache gives real
-             values — but users often refreshed before that happened.
+          3. The baseline lived in psutil's global Process cache, so whether a
+             request saw real values depended on what earlier requests did.
 
-        Fix: remove the > 0 gate entirely.  Sort by CPU%, show top 15 regardless.
-        The table is always populated; active processes rise to the top on each
-        subsequent 3-second refresh.
+        Fix: the ProcessIndex keeps explicit per-PID tick baselines, primed once
+        before the first sample (see _run), and only the sampler refreshes it.
+        Values are real on the first page load and identical for every client.
 
         With pid:host the container's /proc IS the host's /proc, so all host
-        processes are visible.  cmdline is fetched for better identification.
+        processes are visible.  heapq.nlargest picks the 15 without sorting
+        every PID.
         """
-        procs: list = []
-        for p in psutil.process_iter(
-            [
-                "pid",
-                "name",
-                "cpu_percent",
-                "memory_percent",
-                "username",
-                "cmdline",
-                "status",
-            ]
-        ):
-            try:
-                inf = p.info
-                cmdline = inf.get("cmdline") or []
-                # Build short command string; fall back to process name
-                cmd = " ".join(cmdline[:5]).strip() if cmdline else ""
-                if not cmd:
-                    cmd = inf.get("name", "?")
-                if len(cmd) > 80:
-                    cmd = cmd[:77] + "..."
-
-                procs.append(
-                    {
-                        "pid": inf["pid"],
-                        "name": html.escape(str(inf.get("name", "?"))),
-                        "cmd": html.escape(cmd),
-                        "cpu_percent": round(inf.get("cpu_percent") or 0.0, 1),
-                        "memory_percent": round(inf.get("memory_percent") or 0.0, 2),
-                        "username": html.escape(str(inf.get("username", "?"))),
-                        "status": html.escape(str(inf.get("status", "?"))),
-                    }
-                )
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
+        entries = self._processes.refresh()
+        return [
+            self._process_row(p)
+            for p in heapq.nlargest(15, entries, key=lambda p: p.cpu_percent)
+        ]
 
-        procs.sort(key=lambda x: x["cpu_percent"], reverse=True)
-        return procs[:15]
+    def get_processes(self, sort: str = "cpu", limit: int = 15) -> dict:
+        """
+        Top `limit` processes by any PROCESS_SORT_KEYS key, from the index the
+        sampler keeps; fds are counted at most once per sample.
+        """
+        rows = []
+        for value, p in self._processes.top(sort, limit):
+            row = self._process_row(p)
+            if PROCESS_SORT_KEYS[sort][1] is not None:  # read on demand
+                row[sort] = value
+            rows.append(row)
+        return {
+            "sort": sort,
+            "total": len(self._processes.entries),
+            "processes": rows,
+        }
+
+    def _process_row(self, p: _ProcEntry) -> dict:
+        return {
+            "pid": p.pid,
+            "name": html.escape(p.name),
+            "cmd": html.escape(p.cmd),
+            "cpu_percent": p.cpu_percent,
+            "memory_percent": round(p.rss * 100 / self._processes.mem_total, 2),
+            "rss": p.rss,
+            "threads": p.threads,
+            "read_bytes_per_sec": p.read_rate,
+            "write_bytes_per_sec": p.write_rate,
+            "username": html.escape(p.username),
+            "status": p.status,
+        }
 
     # =========================================================================
     # WireGuard  — interface-based detection, no wg binary required
@@ -619,30 +2815,17 @@ class MonitorHandler(BaseHTTPRequestHandler):
         if result["running"]:
             try:
                 out = subprocess.run(
-                    ["wg", "show"], capture_output=True, text=True, timeout=5
+                    ["wg", "show", "all", "dump"],
+                    capture_output=True,
+                    text=True,
+                    timeout=5,
                 )
                 if out.returncode == 0:
-                    peers: list = []
-                    cur: dict | None = None
-                    for line in out.stdout.splitlines():
-                        line = line.strip()
-                        if line.startswith("peer:"):
-                            if cur:
-                                peers.append(cur)
-                            cur = {
-                                "public_key": line.split(":", 1)[1].strip()[:16] + "..."
-                            }
-                        elif cur:
-                            if line.startswith("endpoint:"):
-                                ep = line.split(":", 1)[1].strip()
-                                if "." in ep:
-                                    cur["endpoint"] = "x.x.x." + ep.rsplit(".", 1)[-1]
-                            elif line.startswith("latest handshake:"):
-                                cur["handshake"] = line.split(":", 1)[1].strip()
-                            elif line.startswith("transfer:"):
-                                cur["transfer"] = line.split(":", 1)[1].strip()
-                    if cur:
-                        peers.append(cur)
+                    peers = [
+                        self._wireguard_peer(line.split("\t"))
+                        for line in out.stdout.splitlines()
+                        if line.count("\t") == 8  # interface lines have 5 fields
+                    ]
                     result["peers"] = peers
                     result["peer_count"] = len(peers)
             except Exception:
@@ -650,10 +2833,36 @@ class MonitorHandler(BaseHTTPRequestHandler):
 
         return result
 
+    def _wireguard_peer(self, f: list) -> dict:
+        """
+        One peer line of `wg show all dump`: interface, public key, preshared
+        key, endpoint, allowed IPs, latest handshake (epoch, 0 = never),
+        rx bytes, tx bytes, persistent keepalive.
+        """
+        iface, key, _, endpoint, _, handshake, rx, tx = f[:8]
+        peer: dict = {
+            "interface": iface,
+            "public_key": key[:16] + "...",
+            "latest_handshake": int(handshake),
+            "rx_bytes": int(rx),
+            "tx_bytes": int(tx),
+        }
+        if "." in endpoint:
+            peer["endpoint"] = "x.x.x." + endpoint.rsplit(".", 1)[-1]
+        if int(handshake):
+            peer["handshake"] = self.format_ago(time.time() - int(handshake))
+        if int(rx) or int(tx):
+            peer["transfer"] = (
+                f"{self.format_bytes(int(rx))} received, "
+                f"{self.format_bytes(int(tx))} sent"
+            )
+        return peer
+
     # =========================================================================
     # Firewall  (best-effort; systemctl may not be present in all containers)
     # =========================================================================
 
+    @cached(ttl=60, stale_while_revalidate=True)
     def get_firewall_status(self) -> dict:
         fw: dict = {"active": False, "rules": [], "type": "none"}
         try:
@@ -683,28 +2892,8 @@ class MonitorHandler(BaseHTTPRequestHandler):
     # =========================================================================
 
     def get_last_logins(self) -> list:
-        logins: list = []
-        try:
-            r = subprocess.run(
-                ["last", "-n", "10", "-w"], capture_output=True, text=True, timeout=5
-            )
-            for line in r.stdout.strip().splitlines()[:5]:
-                if not line or line.startswith(("wtmp", "reboot")):
-                    continue
-                parts = line.split()
-                if len(parts) >= 4:
-                    logins.append(
-                        {
-                            "user": html.escape(parts[0]),
-                            "terminal": html.escape(parts[1]),
-                            "date": html.escape(
-                                " ".join(parts[3:7]) if len(parts) >= 7 else "Unknown"
-                            ),
-                        }
-                    )
-        except Exception:
-            pass
-        return logins
+        # Newest user sessions from wtmp (re-read only when the file changes)
+        return self._wtmp.logins()
 
     # =========================================================================
     # Formatting helpers
@@ -723,11 +2912,322 @@ class MonitorHandler(BaseHTTPRequestHandler):
         mn = int((seconds % 3600) // 60)
         return f"{d}d {h}h {mn}m"
 
+    def format_ago(self, seconds: float) -> str:
+        """`wg show` style: "1 hour, 2 minutes, 5 seconds ago"."""
+        left = max(0, int(seconds))
+        parts = []
+        for unit, size in (("day", 86400), ("hour", 3600), ("minute", 60)):
+            n, left = divmod(left, size)
+            if n:
+                parts.append(f"{n} {unit}{'s' if n != 1 else ''}")
+        if left or not parts:
+            parts.append(f"{left} second{'s' if left != 1 else ''}")
+        return ", ".join(parts) + " ago"
+
+
+# ─── Request Handler ──────────────────────────────────────────────────────────
+
+
+# Seconds between SSE comment frames when no snapshot is published
+STREAM_KEEPALIVE = 15
+
+# Distinct ?fields= subsets cached per snapshot (the rest are encoded per hit)
+FIELD_VIEWS_PER_SNAPSHOT = 32
+
+STREAM_HEADERS: tuple = (
+    ("Content-Type", "text/event-stream"),
+    ("Cache-Control", "no-cache"),
+    ("X-Accel-Buffering", "no"),  # don't buffer behind nginx
+)
+
+
+def json_response(status: int, obj) -> tuple[int, EncodedBody]:
+    return status, EncodedBody(json.dumps(obj).encode(), "application/json")
+
+
+def encoded_response(
+    enc: EncodedBody | None, status: int, accept_encoding: str, if_none_match: str
+) -> tuple[int, list, bytes]:
+    """
+    Serve a shared EncodedBody: negotiate Content-Encoding, answer a
+    matching If-None-Match with 304, otherwise the cached bytes.  Returns
+    (status, headers, body); `enc` None is an empty body.
+    """
+    if enc is None:
+        return status, [("Content-Length", "0")], b""
+    coding = enc.negotiate(accept_encoding)
+    etag = enc.etag_for(coding)
+    if status == 200:
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        if etag in tags or enc.etag in tags or "*" in tags:
+            return 304, [("ETag", etag), ("Vary", "Accept-Encoding")], b""
+    body = enc.encoded(coding)
+    headers = [("Content-type", enc.content_type)]
+    if coding != "identity":
+        headers.append(("Content-Encoding", coding))
+    headers += [
+        ("Content-Length", str(len(body))),
+        ("ETag", etag),
+        ("Vary", "Accept-Encoding"),
+        ("Cache-Control", "no-cache"),
+    ]
+    return status, headers, body
+
+
+def stream_frame(snap: Snapshot | None, seen: int | None, synced: bool, deltas: bool):
+    """
+    The bytes to send a stream viewer that last saw event `seen`: a
+    keep-alive comment for no new snapshot, the prebuilt patch event when
+    it follows on directly from a full one, the full event otherwise.
+    """
+    if snap is None:
+        return b": keepalive\n\n"
+    if deltas and synced and snap.patch and snap.seq == seen + 1:
+        return snap.patch
+    return snap.event
+
+
+class MonitorHandler(BaseHTTPRequestHandler):
+    # Persistent connections: every response carries Content-Length (the
+    # stream closes instead), and an idle connection is dropped after
+    # `timeout` seconds
+    protocol_version = "HTTP/1.1"
+    timeout = HTTP_IDLE_TIMEOUT
+    disable_nagle_algorithm = True  # headers and body go out as two writes
+
+    # Shared background sampler, attached by run_server()
+    collector: MetricsCollector | None = None
+
+    # Dashboard page, encoded and precompressed once (see build_dashboard)
+    dashboard: EncodedBody | None = None
+
+    # ── Logging ───────────────────────────────────────────────────────────────
+
+    def log_message(self, format, *args):
+        pass  # suppress per-request noise
+
+    # ── Routing ───────────────────────────────────────────────────────────────
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/api/stream":
+            self.send_stream(parse_qs(url.query))
+            return
+        status, enc = self.resolve(url.path, parse_qs(url.query))
+        self.send_encoded(enc, status)
+
+    @classmethod
+    def resolve(cls, path: str, qs: dict) -> tuple[int, EncodedBody | None]:
+        """
+        Status and body for a GET of anything but the event stream.  Shared
+        with AsyncMonitorServer; it can block (waiting for the first
+        snapshot, a history query, a process listing), so that server runs
+        it on its executor when it might.
+        """
+        if path == "/":
+            if cls.dashboard is None:
+                cls.dashboard = cls.build_dashboard()
+            return 200, cls.dashboard
+
+        if path in ("/api/metrics", "/api/v2/metrics", "/metrics"):
+            snap = cls.collector.latest(timeout=cls.timeout) if cls.collector else None
+            if snap is None:
+                return 503, None
+            if path == "/metrics":
+                return 200, snap.metrics
+            if "fields" in qs or "exclude" in qs:
+                return cls.fields_view(snap, path == "/api/v2/metrics", qs)
+            return 200, snap.v2 if path == "/api/v2/metrics" else snap.response
+
+        if path == "/api/history":
+            return cls.history_view(qs)
+
+        if path == "/api/processes":
+            return cls.processes_view(qs)
+
+        return 404, None
+
+    def send_encoded(self, enc: EncodedBody | None, status: int = 200) -> None:
+        status, headers, body = encoded_response(
+            enc,
+            status,
+            self.headers.get("Accept-Encoding", ""),
+            self.headers.get("If-None-Match", ""),
+        )
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        if not self.close_connection:
+            self.send_header("Keep-Alive", f"timeout={self.timeout}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    # ── Push stream ───────────────────────────────────────────────────────────
+
+    @classmethod
+    def fields_view(cls, snap: Snapshot, v2: bool, qs: dict):
+        """
+        GET /api/metrics?fields=cpu,memory  (or ?exclude=top_processes,...)
+
+        Only the named top-level sections of the latest sample, plus its
+        timestamp.  On v2 the v1 names of renamed sections are accepted too
+        (see V2_SECTION_ALIASES).  Nothing is collected: the subset is cut from the
+        published snapshot and encoded once per snapshot and field set, so
+        a probe polling the same fields is served from cache.
+        """
+        data = snap.data_v2 if v2 else snap.data
+        names = {
+            key: {n.strip() for v in qs.get(key, []) for n in v.split(",") if n.strip()}
+            for key in ("fields", "exclude")
+        }
+        if v2:
+            names = {
+                key: {V2_SECTION_ALIASES.get(n, n) for n in value}
+                for key, value in names.items()
+            }
+        known = set(data) | {"stale", "error"}
+        unknown = (names["fields"] | names["exclude"]) - known
+        if unknown:
+            return json_response(
+                400,
+                {
+                    "error": f"unknown field: {', '.join(sorted(unknown))}",
+                    "fields": sorted(known),
+                },
+            )
+        # `units` describes the other sections, so only fields= leaves it out
+        keep = frozenset((names["fields"] or known) - names["exclude"])
+        with snap.views_lock:
+            enc = snap.views.get((v2, keep))
+        if enc is None:
+            always = ("schema", "timestamp") if v2 else ("timestamp",)
+            subset = {k: v for k, v in data.items() if k in keep or k in always}
+            enc = EncodedBody(json.dumps(subset).encode(), "application/json")
+            with snap.views_lock:  # encoded outside the lock; first one wins
+                if len(snap.views) < FIELD_VIEWS_PER_SNAPSHOT:
+                    enc = snap.views.setdefault((v2, keep), enc)
+        return 200, enc
+
+    def send_stream(self, qs: dict) -> None:
+        """
+        GET /api/stream[?delta=0] — Server-Sent Events, one per snapshot.
+
+        The first event on every connection is the full snapshot (a default
+        "message" event).  After that each sample is sent as a "patch" event,
+        {"base": <previous id>, "patch": json_delta(...)}, unless the viewer
+        fell behind or asked for delta=0, in which case it gets full events.
+        Both kinds are framed once at publish time, so a viewer costs one
+        write of shared bytes per sample.
+
+        A reconnecting EventSource sends Last-Event-ID: if that is still the
+        newest snapshot the stream waits for the next one, otherwise the
+        latest is sent straight away.
+        """
+        if self.collector is None:
+            self.send_encoded(None, 503)
+            return
+        deltas = qs.get("delta", ["1"])[-1] != "0"
+        last = self.headers.get("Last-Event-ID", "").strip()
+        seen = int(last) if last.isdigit() else None
+        synced = False  # has this connection sent a full snapshot yet?
+
+        self.send_response(200)
+        for name, value in STREAM_HEADERS:
+            self.send_header(name, value)
+        self.send_header("Connection", "close")  # unbounded body: no reuse
+        self.end_headers()
+        try:
+            self.wfile.write(b"retry: 3000\n\n")
+            while True:
+                snap = self.collector.wait_next(seen, timeout=STREAM_KEEPALIVE)
+                self.wfile.write(stream_frame(snap, seen, synced, deltas))
+                if snap is not None:
+                    seen, synced = snap.seq, True
+                self.wfile.flush()
+        except OSError:
+            pass  # viewer went away (BrokenPipe, reset or write timeout)
+
+    # ── History API ───────────────────────────────────────────────────────────
+
+    @classmethod
+    def history_view(cls, qs: dict):
+        """
+        GET /api/history?metric=cpu,memory&since=<epoch | -seconds>
+                         &points=<budget>&stat=avg|min|max|last
+
+        `metric` defaults to every series; a negative `since` is relative to
+        now (since=-300 → last five minutes).  The tier (raw, 1m, 1h) is
+        chosen from the range and the point budget (default 600).
+        """
+        if cls.collector is None:
+            return json_response(503, {"error": "collector not running"})
+        names = [
+            n.strip() for v in qs.get("metric", []) for n in v.split(",") if n.strip()
+        ] or list(HISTORY_METRICS)
+        unknown = [n for n in names if n not in HISTORY_METRICS]
+        if unknown:
+            return json_response(
+                400,
+                {
+                    "error": f"unknown metric: {', '.join(unknown)}",
+                    "metrics": list(HISTORY_METRICS),
+                },
+            )
+        try:
+            since = float(qs.get("since", ["0"])[-1])
+            points = int(qs.get("points", ["600"])[-1])
+            if not (1 <= points <= 100_000):
+                raise ValueError
+        except ValueError:
+            return json_response(
+                400, {"error": "since must be a number, points 1-100000"}
+            )
+        stat = qs.get("stat", ["avg"])[-1]
+        if stat not in HISTORY_STATS:
+            return json_response(400, {"error": f"stat must be one of {HISTORY_STATS}"})
+        if since < 0:
+            since += time.time()
+        return json_response(
+            200, cls.collector.history.query(names, since, points, stat)
+        )
+
+    @classmethod
+    def processes_view(cls, qs: dict):
+        """
+        GET /api/processes?sort=cpu|rss|io_read|io_write|threads|fds&limit=N
+
+        Top `limit` (default 15, at most 1000) processes by `sort`; io_* are
+        bytes per second read from / written to storage.
+        """
+        if cls.collector is None:
+            return json_response(503, {"error": "collector not running"})
+        sort = qs.get("sort", ["cpu"])[-1]
+        if sort not in PROCESS_SORT_KEYS:
+            return json_response(
+                400, {"error": f"sort must be one of {list(PROCESS_SORT_KEYS)}"}
+            )
+        try:
+            limit = int(qs.get("limit", ["15"])[-1])
+            if not (1 <= limit <= 1000):
+                raise ValueError
+        except ValueError:
+            return json_response(400, {"error": "limit must be 1-1000"})
+        return json_response(200, cls.collector.get_processes(sort, limit))
+
     # =========================================================================
     # Dashboard HTML  (CSS + JS)
     # =========================================================================
 
-    def get_dashboard_html(self) -> str:
+    @classmethod
+    def build_dashboard(cls) -> EncodedBody:
+        return EncodedBody(
+            cls.get_dashboard_html().encode(),
+            "text/html; charset=utf-8",
+            precompress=True,
+        )
+
+    @staticmethod
+    def get_dashboard_html() -> str:
         return r"""<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -797,6 +3297,7 @@ class MonitorHandler(BaseHTTPRequestHandler):
         .metric-value { color: #333; font-size: 14px; font-weight: 600; }
         .metric-value.green { color: #059669; }
         .metric-value.blue  { color: #2563eb; }
+        .metric-value .steal-high { color: #dc2626; }
 
         .section-label {
             font-size: 12px;
@@ -912,6 +3413,7 @@ class MonitorHandler(BaseHTTPRequestHandler):
         .iface-row { display:flex; justify-content:space-between; font-size:12px; padding:4px 0; }
         .iface-name { font-family:monospace; font-weight:600; color:#1e3c72; min-width:60px; }
         .iface-stat { color:#555; }
+        .iface-stat.faulty { color:#dc2626; }
 
         /* ── Interface groups ── */
         .iface-group { margin-bottom:8px; }
@@ -1001,6 +3503,11 @@ class MonitorHandler(BaseHTTPRequestHandler):
                 <span class="metric-value">${d.cpu.overall.toFixed(1)}%</span>
             </div>
             <div class="progress-bar"><div class="progress-fill ${pct(d.cpu.overall)}" style="width:${d.cpu.overall}%"></div></div>
+            ${d.cpu.breakdown && d.cpu.breakdown.user !== undefined ? `
+            <div class="metric-row" style="margin-top:5px;">
+                <span class="metric-label">User / System / IO Wait / Steal</span>
+                <span class="metric-value">${d.cpu.breakdown.user}% / ${d.cpu.breakdown.system}% / ${d.cpu.breakdown.iowait}% / <span class="${d.cpu.breakdown.steal >= 10 ? 'steal-high' : ''}">${d.cpu.breakdown.steal}%</span></span>
+            </div>` : ''}
             <div class="metric-row" style="margin-top:15px;">
                 <span class="metric-label">Load Average (1m / 5m / 15m)</span>
                 <span class="metric-value">${d.cpu.load_avg[0].toFixed(2)}, ${d.cpu.load_avg[1].toFixed(2)}, ${d.cpu.load_avg[2].toFixed(2)}</span>
@@ -1089,23 +3596,23 @@ class MonitorHandler(BaseHTTPRequestHandler):
             <div class="metric-row"><span class="metric-label">Drops (In / Out)</span><span class="metric-value">${d.network.drops_in} / ${d.network.drops_out}</span></div>
 
             ${d.network.interfaces.length > 0 ? `
-            <div class="section-label">Per Interface</div>
+            <div class="section-label">Per Interface (current rate)</div>
             ${(() => {
                 const dockerRe = /^(docker|br-|veth)/;
                 const sys = [], dkr = [];
                 d.network.interfaces.forEach(i => (dockerRe.test(i.name) ? dkr : sys).push(i));
-                const row = i => '<div class="iface-row"><span class="iface-name">' + i.name + '</span><span class="iface-stat">&#8595; ' + i.bytes_recv + ' &nbsp; &#8593; ' + i.bytes_sent + '</span></div>';
+                const faults = i => (i.rx_errors_per_sec || 0) + (i.tx_errors_per_sec || 0) + (i.rx_drops_per_sec || 0) + (i.tx_drops_per_sec || 0);
+                const row = i => '<div class="iface-row" title="Total &#8595; ' + i.bytes_recv + ' &#8593; ' + i.bytes_sent + (i.rx_rate !== undefined ? ' · ' + i.rx_packets_per_sec + ' / ' + i.tx_packets_per_sec + ' pkt/s · errors ' + i.rx_errors_per_sec + ' / ' + i.tx_errors_per_sec + '/s · drops ' + i.rx_drops_per_sec + ' / ' + i.tx_drops_per_sec + '/s' : ' · no rate: past the per-interface limit') + '"><span class="iface-name">' + i.name + '</span><span class="iface-stat' + (faults(i) > 0 ? ' faulty' : '') + '">' + (i.rx_rate !== undefined ? '&#8595; ' + i.rx_rate + ' &nbsp; &#8593; ' + i.tx_rate : 'n/a') + '</span></div>';
                 let out = '<div class="iface-group">';
                 sys.forEach(i => { out += row(i); });
                 if (dkr.length > 0) {
                     let drx = 0, dtx = 0;
                     dkr.forEach(i => {
-                        const parseVal = s => { const m = s.match(/([\d.]+)\s*(\w+)/); if(!m) return 0; const v=parseFloat(m[1]), u=m[2].toUpperCase(); const mul={B:1,KB:1024,MB:1048576,GB:1073741824,TB:1099511627776}; return v*(mul[u]||1); };
-                        drx += parseVal(i.bytes_recv);
-                        dtx += parseVal(i.bytes_sent);
+                        drx += i.rx_bytes_per_sec || 0;
+                        dtx += i.tx_bytes_per_sec || 0;
                     });
-                    const fmtBytes = b => { if(b<1024) return b+' B'; if(b<1048576) return (b/1024).toFixed(1)+' KB'; if(b<1073741824) return (b/1048576).toFixed(1)+' MB'; if(b<1099511627776) return (b/1073741824).toFixed(1)+' GB'; return (b/1099511627776).toFixed(1)+' TB'; };
-                    out += '<details><summary>Docker <span style="font-weight:400;color:#888">(' + dkr.length + ' interfaces)</span><span class="iface-summary-stats">&#8595; ' + fmtBytes(drx) + ' &nbsp; &#8593; ' + fmtBytes(dtx) + '</span></summary><div class="iface-group-body">';
+                    const fmtBytes = b => { if(b<1024) return b.toFixed(0)+' B'; if(b<1048576) return (b/1024).toFixed(1)+' KB'; if(b<1073741824) return (b/1048576).toFixed(1)+' MB'; if(b<1099511627776) return (b/1073741824).toFixed(1)+' GB'; return (b/1099511627776).toFixed(1)+' TB'; };
+                    out += '<details><summary>Docker <span style="font-weight:400;color:#888">(' + dkr.length + ' interfaces)</span><span class="iface-summary-stats">&#8595; ' + fmtBytes(drx) + '/s &nbsp; &#8593; ' + fmtBytes(dtx) + '/s</span></summary><div class="iface-group-body">';
                     dkr.forEach(i => { out += row(i); });
                     out += '</div></details>';
                 }
@@ -1119,10 +3626,19 @@ class MonitorHandler(BaseHTTPRequestHandler):
             h += `
             <div class="card">
                 <h2>Disk I/O Statistics</h2>
+                ${d.disk_io.read_rate !== undefined ? `
+                <div class="metric-row"><span class="metric-label">Read Rate</span><span class="metric-value green">${d.disk_io.read_rate} · ${d.disk_io.read_iops} IOPS</span></div>
+                <div class="metric-row"><span class="metric-label">Write Rate</span><span class="metric-value blue">${d.disk_io.write_rate} · ${d.disk_io.write_iops} IOPS</span></div>` : ''}
                 <div class="metric-row"><span class="metric-label">Total Read</span><span class="metric-value">${d.disk_io.read_bytes}</span></div>
                 <div class="metric-row"><span class="metric-label">Total Written</span><span class="metric-value">${d.disk_io.write_bytes}</span></div>
                 <div class="metric-row"><span class="metric-label">Read Operations</span><span class="metric-value">${d.disk_io.read_count.toLocaleString()}</span></div>
                 <div class="metric-row"><span class="metric-label">Write Operations</span><span class="metric-value">${d.disk_io.write_count.toLocaleString()}</span></div>
+                ${(d.disk_devices || []).map(v => `
+                <div class="metric-row" title="read ${v.read_rate} · write ${v.write_rate} · await ${v.await_ms} ms · queue ${v.queue_depth}">
+                    <span class="metric-label">${v.device}</span>
+                    <span class="metric-value">${v.read_iops} r/s · ${v.write_iops} w/s · ${v.await_ms} ms · ${v.util}% util</span>
+                </div>
+                <div class="progress-bar"><div class="progress-fill ${pct(v.util)}" style="width:${v.util}%"></div></div>`).join('')}
             </div>`;
         }
 
@@ -1133,6 +3649,11 @@ class MonitorHandler(BaseHTTPRequestHandler):
             <div class="metric-row"><span class="metric-label">Established</span><span class="metric-value">${d.connections.established}</span></div>
             <div class="metric-row"><span class="metric-label">Listening</span><span class="metric-value">${d.connections.listen}</span></div>
             <div class="metric-row"><span class="metric-label">Time Wait</span><span class="metric-value">${d.connections.time_wait}</span></div>
+            ${d.connections.states ? Object.entries(d.connections.states)
+                .filter(([st, n]) => n > 0 && !['ESTABLISHED', 'LISTEN', 'TIME_WAIT'].includes(st))
+                .map(([st, n]) => `<div class="metric-row"><span class="metric-label">${st.replace('_', ' ')}</span><span class="metric-value">${n}</span></div>`)
+                .join('') : ''}
+            ${d.connections.udp !== undefined ? `<div class="metric-row"><span class="metric-label">UDP Sockets</span><span class="metric-value">${d.connections.udp}</span></div>` : ''}
             <div class="metric-row"><span class="metric-label">Total Connections</span><span class="metric-value">${d.connections.total}</span></div>
         </div>`;
 
@@ -1207,7 +3728,7 @@ class MonitorHandler(BaseHTTPRequestHandler):
         h += `
         <div class="card" style="margin-bottom:20px;">
             <h2>Top Processes by CPU Usage</h2>
-            <p class="subtitle-note">All host processes visible via pid:host. CPU % accurate from the second refresh onward (psutil baseline).</p>
+            <p class="subtitle-note">All host processes visible via pid:host. CPU % is measured between samples from the first load.</p>
             <table class="process-table">
                 <colgroup>
                     <col class="col-pid"><col class="col-cmd">
@@ -1245,7 +3766,7 @@ class MonitorHandler(BaseHTTPRequestHandler):
                 <h2>Recent Login Activity</h2>
                 ${d.last_logins.map(l => `
                 <div class="login-item">
-                    <div class="login-user">${l.user} via ${l.terminal}</div>
+                    <div class="login-user">${l.user} via ${l.terminal}${l.host ? ` from ${l.host}` : ''}</div>
                     <div class="login-details">${l.date}</div>
                 </div>`).join('')}
             </div>`;
@@ -1254,37 +3775,315 @@ class MonitorHandler(BaseHTTPRequestHandler):
         content.innerHTML = h;
     }
 
+    function applyUpdate(data) {
+        renderDashboard(data);
+        document.getElementById('last-update').textContent =
+            'Last updated: ' + data.timestamp;
+    }
+
+    function showConnectionError() {
+        document.getElementById('dashboard-content').innerHTML =
+            '<div class="alert">Connection error — retrying…</div>';
+    }
+
     function updateDashboard() {
         fetch('/api/metrics')
             .then(r => r.json())
-            .then(data => {
-                renderDashboard(data);
-                document.getElementById('last-update').textContent =
-                    'Last updated: ' + data.timestamp;
-            })
-            .catch(() => {
-                document.getElementById('dashboard-content').innerHTML =
-                    '<div class="alert">Connection error — retrying…</div>';
-            });
+            .then(applyUpdate)
+            .catch(showConnectionError);
+    }
+
+    // Apply a json_delta() from the server (merge patch + array deltas)
+    function applyDelta(target, patch) {
+        if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) return patch;
+        if ('$value' in patch) return patch.$value;  // replaced with null / an object
+        if (Array.isArray(target) && ('$key' in patch || '$len' in patch)) {
+            const set = patch.$set;
+            if ('$key' in patch) {
+                const before = new Map(target.map(it => [String(it[patch.$key]), it]));
+                return patch.$order.map(id => {
+                    const k = String(id);
+                    if (!before.has(k)) return set[k];
+                    return k in set ? applyDelta(before.get(k), set[k]) : before.get(k);
+                });
+            }
+            const out = [];
+            for (let i = 0; i < patch.$len; i++) {
+                const k = String(i);
+                if (i >= target.length) out.push(set[k]);
+                else out.push(k in set ? applyDelta(target[i], set[k]) : target[i]);
+            }
+            return out;
+        }
+        const out = (target && typeof target === 'object' && !Array.isArray(target))
+            ? Object.assign({}, target) : {};
+        for (const [k, v] of Object.entries(patch)) {
+            if (v === null) delete out[k];
+            else out[k] = applyDelta(out[k], v);
+        }
+        return out;
+    }
+
+    function openStream() {
+        // Full sample on connect, then deltas; EventSource reconnects by itself
+        const stream = new EventSource('/api/stream');
+        let current = null, lastId = null;
+        stream.onmessage = e => {
+            current = JSON.parse(e.data);
+            lastId = e.lastEventId;
+            applyUpdate(current);
+        };
+        stream.addEventListener('patch', e => {
+            const msg = JSON.parse(e.data);
+            if (current === null || String(msg.base) !== lastId) {
+                stream.close();  // out of sync: reconnect for a full sample
+                openStream();
+                return;
+            }
+            current = applyDelta(current, msg.patch);
+            lastId = e.lastEventId;
+            applyUpdate(current);
+        });
+        stream.onerror = showConnectionError;
     }
 
-    updateDashboard();
-    setInterval(updateDashboard, 3000);
+    if (window.EventSource) {
+        openStream();
+    } else {
+        updateDashboard();
+        setInterval(updateDashboard, 3000);
+    }
 </script>
 </body>
 </html>"""  # end of get_dashboard_html
 
 
+# ─── Asyncio HTTP Server ──────────────────────────────────────────────────────
+
+# Threads for request work that can block (see MonitorHandler.resolve)
+ASYNC_WORKERS = 4
+
+# Largest request line + headers accepted (431 beyond it)
+ASYNC_MAX_HEAD = 16 * 1024
+
+# Open connections, streams included; more are answered 503 and closed
+ASYNC_MAX_CONNECTIONS = 4096
+
+# Paths whose MonitorHandler.resolve does real work on every request
+ASYNC_BLOCKING_PATHS = frozenset({"/api/history", "/api/processes"})
+
+
+class AsyncMonitorServer:
+    """
+    SERVER_MODE=async: one event loop serves every connection as a
+    coroutine instead of a thread.  HTTP/1.1 keep-alive (and pipelined)
+    requests, API calls and SSE viewers share the loop; only requests that
+    can block go to a small executor.  An idle viewer costs a socket and a
+    few KB of coroutine state, and each snapshot the sampler publishes is
+    written to it as the same shared bytes.
+
+    Same interface as ThreadingHTTPServer for run_server(): the socket is
+    bound in the constructor, then serve_forever(), shutdown() and
+    server_close().
+    """
+
+    def __init__(self, address: tuple, collector: MetricsCollector) -> None:
+        self.collector = collector
+        self.socket = socket.create_server(address, backlog=512)
+        # A thousand viewers would not fit the common 1024-descriptor default
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        want = ASYNC_MAX_CONNECTIONS + 256
+        if hard != resource.RLIM_INFINITY:
+            want = min(want, hard)
+        if soft != resource.RLIM_INFINITY and soft < want:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (want, hard))
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stopping: asyncio.Event | None = None
+        self._published: asyncio.Event | None = None
+        self._snapshot: Snapshot | None = None
+        self._connections = 0
+
+    def serve_forever(self) -> None:
+        asyncio.run(self._serve())
+
+    def shutdown(self) -> None:
+        if self._loop and self._stopping:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    def server_close(self) -> None:
+        self.socket.close()
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop.set_default_executor(
+            futures.ThreadPoolExecutor(ASYNC_WORKERS, thread_name_prefix="http")
+        )
+        self._stopping = asyncio.Event()
+        self._published = asyncio.Event()
+        self._snapshot = self.collector.latest(timeout=0)
+
+        def relay(snap: Snapshot) -> None:  # sampler thread → event loop
+            try:
+                self._loop.call_soon_threadsafe(self._publish, snap)
+            except RuntimeError:
+                pass  # loop already closed
+
+        self.collector.subscribe(relay)
+        try:
+            server = await asyncio.start_server(
+                self._connection, sock=self.socket, limit=ASYNC_MAX_HEAD
+            )
+            async with server:
+                await self._stopping.wait()
+        finally:
+            self.collector.unsubscribe(relay)
+
+    def _publish(self, snap: Snapshot) -> None:
+        self._snapshot = snap
+        self._published.set()
+        self._published = asyncio.Event()
+
+    async def _next(self, seen: int | None) -> Snapshot | None:
+        """The async twin of MetricsCollector.wait_next()."""
+        snap = self._snapshot
+        if snap is None or snap.seq == seen:
+            try:
+                await asyncio.wait_for(self._published.wait(), STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                return None
+            snap = self._snapshot
+        return snap
+
+    # ── Connections ───────────────────────────────────────────────────────────
+
+    async def _connection(self, reader, writer) -> None:
+        if self._connections >= ASYNC_MAX_CONNECTIONS:
+            writer.write(self._head(503, [("Content-Length", "0")], False))
+            writer.close()
+            return
+        self._connections += 1
+        try:
+            while await self._request(reader, writer):
+                pass
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass  # client went away, or stopped reading for too long
+        except asyncio.CancelledError:
+            pass  # shutting down; nothing awaits this task
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    async def _request(self, reader, writer) -> bool:
+        """Serve one request; False once the connection should be closed."""
+        try:
+            head = await asyncio.wait_for(
+                reader.readuntil(b"\r\n\r\n"), MonitorHandler.timeout
+            )
+        except asyncio.LimitOverrunError:
+            await self._send(writer, 431, [("Content-Length", "0")], b"", False)
+            return False
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            return False  # closed or idle between requests
+
+        request, *lines = head.decode("latin-1").split("\r\n")
+        headers = {}
+        for line in lines:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        parts = request.split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+            await self._send(writer, 400, [("Content-Length", "0")], b"", False)
+            return False
+        method, target, version = parts
+        if method != "GET":
+            await self._send(writer, 501, [("Content-Length", "0")], b"", False)
+            return False
+        if headers.get("content-length", "0") != "0" or "transfer-encoding" in headers:
+            await self._send(writer, 400, [("Content-Length", "0")], b"", False)
+            return False
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = "keep-alive" in connection
+        else:
+            keep_alive = "close" not in connection
+
+        url = urlsplit(target)
+        qs = parse_qs(url.query)
+        if url.path == "/api/stream":
+            await self._stream(writer, qs, headers)
+            return False
+        if url.path in ASYNC_BLOCKING_PATHS or self._snapshot is None:
+            status, enc = await self._loop.run_in_executor(
+                None, MonitorHandler.resolve, url.path, qs
+            )
+        else:
+            status, enc = MonitorHandler.resolve(url.path, qs)
+        status, fields, body = encoded_response(
+            enc,
+            status,
+            headers.get("accept-encoding", ""),
+            headers.get("if-none-match", ""),
+        )
+        await self._send(writer, status, fields, body, keep_alive)
+        return keep_alive
+
+    async def _stream(self, writer, qs: dict, headers: dict) -> None:
+        """GET /api/stream, as MonitorHandler.send_stream."""
+        deltas = qs.get("delta", ["1"])[-1] != "0"
+        last = headers.get("last-event-id", "").strip()
+        seen = int(last) if last.isdigit() else None
+        synced = False
+        await self._send(writer, 200, STREAM_HEADERS, b"retry: 3000\n\n", False)
+        while True:
+            snap = await self._next(seen)
+            writer.write(stream_frame(snap, seen, synced, deltas))
+            if snap is not None:
+                seen, synced = snap.seq, True
+            await asyncio.wait_for(writer.drain(), MonitorHandler.timeout)
+
+    @staticmethod
+    def _head(status: int, fields, keep_alive: bool) -> bytes:
+        lines = [
+            f"HTTP/1.1 {status} {MonitorHandler.responses[status][0]}",
+            f"Date: {formatdate(usegmt=True)}",
+        ]
+        lines += [f"{name}: {value}" for name, value in fields]
+        if keep_alive:
+            lines.append(f"Keep-Alive: timeout={MonitorHandler.timeout}")
+        else:
+            lines.append("Connection: close")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send(self, writer, status, fields, body, keep_alive) -> None:
+        writer.write(self._head(status, fields, keep_alive) + body)
+        await asyncio.wait_for(writer.drain(), MonitorHandler.timeout)
+
+
 # =============================================================================
 # Server bootstrap
 # =============================================================================
 
 
-def run_server(port: int = 8080) -> None:
+def run_server(
+    port: int = 8080,
+    interval: float = 3.0,
+    deadline: float = 2.0,
+    history_hours: float = 24.0,
+    history_dir: str | None = None,
+    server_mode: str = "threaded",
+) -> None:
     server = None
+    collector = MetricsCollector(
+        interval=interval,
+        deadline=deadline,
+        history_hours=history_hours,
+        history_dir=history_dir,
+    )
 
     def _shutdown(sig, frame):
         print("\nShutting down…")
+        collector.stop()
         if server:
             server.shutdown()
         sys.exit(0)
@@ -1293,12 +4092,29 @@ def run_server(port: int = 8080) -> None:
     signal.signal(signal.SIGTERM, _shutdown)
 
     try:
-        server = ThreadingHTTPServer(("0.0.0.0", port), MonitorHandler)
-        server.timeout = 10
+        MonitorHandler.collector = collector
+        MonitorHandler.dashboard = MonitorHandler.build_dashboard()
+        collector.start()
+        if server_mode == "async":
+            server = AsyncMonitorServer(("0.0.0.0", port), collector)
+        else:
+            server = ThreadingHTTPServer(("0.0.0.0", port), MonitorHandler)
+            server.timeout = 10
         print(f"Oracle Monitoring Dashboard (Docker edition) running on port {port}")
         port_suffix = "" if port == 8080 else f":{port}"
         print(f"Access at http://<host-ip>{port_suffix}")
-        print("Auto-refreshes every 3 seconds.  Press Ctrl+C to stop.")
+        history = collector.history
+        where = "in memory"
+        if history.directory:
+            state = "reattached" if history.tiers[0].reattached else "new"
+            where = f"in {history.directory} ({state})"
+        print(
+            f"History: {history_hours:g} h raw, "
+            f"{history.nbytes / 1048576:.1f} MB fixed, {where}"
+        )
+        if server_mode == "async":
+            print(f"Serving from one event loop, {ASYNC_WORKERS} worker threads")
+        print(f"Sampling every {interval:g} seconds.  Press Ctrl+C to stop.")
         server.serve_forever()
     except PermissionError:
         print(f"ERROR: port {port} requires root privileges")
@@ -1310,15 +4126,41 @@ def run_server(port: int = 8080) -> None:
             server.server_close()
 
 
+def env_number(name: str, default, lo, hi, cast=float):
+    """Read a numeric env var, exiting with a clear message when invalid."""
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = cast(raw)
+        if not (lo <= value <= hi):
+            raise ValueError
+    except ValueError:
+        print(f"ERROR: invalid {name} env var: {raw!r} (must be {lo}-{hi})")
+        sys.exit(2)
+    return value
+
+
+def env_choice(name: str, choices: tuple) -> str:
+    """Read an enumerated env var (first choice is the default)."""
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return choices[0]
+    if raw.lower() not in choices:
+        print(f"ERROR: invalid {name} env var: {raw!r} (must be {'/'.join(choices)})")
+        sys.exit(2)
+    return raw.lower()
+
+
 if __name__ == "__main__":
-    port = 8080
-    raw_port = os.environ.get("PORT", "").strip()
-    if raw_port:
-        try:
-            port = int(raw_port)
-            if not (1 <= port <= 65535):
-                raise ValueError
-        except ValueError:
-            print(f"ERROR: invalid PORT env var: {raw_port!r} (must be 1-65535)")
-            sys.exit(2)
-    run_server(port)
+    if sys.argv[1:2] == ["--bench-sockets"]:
+        bench_socket_scan(int(sys.argv[2]) if len(sys.argv) > 2 else 100_000)
+        sys.exit(0)
+    run_server(
+        port=env_number("PORT", 8080, 1, 65535, int),
+        interval=env_number("SAMPLE_INTERVAL", 3.0, 0.5, 3600),
+        deadline=env_number("COLLECT_DEADLINE", 2.0, 0.1, 60),
+        history_hours=env_number("HISTORY_HOURS", 24.0, 0.1, 720),
+        history_dir=os.environ.get("HISTORY_DIR", "").strip() or None,
+        server_mode=env_choice("SERVER_MODE", ("threaded", "async")),
+    )